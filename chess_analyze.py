@@ -0,0 +1,219 @@
+# Bulk position analysis: run the engine over EPD puzzle sets or PGN archives
+#
+#   python chess_analyze.py puzzles.epd --depth 6 --out puzzles.jsonl
+#   python chess_analyze.py games.pgn --movetime 0.5 --workers 8 --out games.jsonl
+#   python chess_analyze.py games.pgn --out games.jsonl --resume      carry on after a crash / Ctrl-C
+#
+# Positions are read lazily (one EPD line / one PGN game at a time) and only a
+# small window of them is in flight across the worker processes, so memory
+# stays flat however large the input is. Results are written one JSON line per
+# position, in input order, as soon as they are ready; --resume counts the
+# lines already in --out and skips that many positions.
+#
+# EPD `bm` / `am` operations are checked against the engine's move ("ok");
+# for PGN positions the move actually played is reported as "played".
+#
+#   python chess_analyze.py games.pgn --static --out static.jsonl      static eval only, no search
+#
+# --static skips the search and the worker pool: positions are scored in
+# chunks with chess_eval.evaluate_many and written as "static".
+
+import argparse
+import itertools
+import json
+import multiprocessing as mp
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import chess
+import chess.pgn
+
+from chess_engine import TT_SIZE_MB, Search, TranspositionTable
+from chess_eval import evaluate_many
+
+IN_FLIGHT = 4         # positions per worker submitted but not yet written
+STATIC_CHUNK = 512    # positions per evaluate_many call in --static
+
+# ------------- readers -------------
+def read_epd(path: str):
+    """Yield one task dict per EPD line. Malformed lines are reported and
+    skipped (the same ones every run, so --resume still lines up)."""
+    with open(path) as f:
+        for n, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                board, ops = chess.Board.from_epd(line)
+            except ValueError as e:
+                print(f"\n{path}:{n}: skipped, bad EPD: {e}", file=sys.stderr)
+                continue
+            yield {"id": str(ops.get("id", n)), "fen": board.fen(),
+                   "bm": [m.uci() for m in ops.get("bm", [])],
+                   "am": [m.uci() for m in ops.get("am", [])]}
+
+def read_pgn(path: str, min_ply: int = 0):
+    """Yield one task dict per mainline position (from `min_ply` on) of every game."""
+    with open(path, errors="replace") as f:
+        n = 0
+        while True:
+            game = chess.pgn.read_game(f)
+            if game is None:
+                return
+            n += 1
+            board = game.board()
+            for ply, move in enumerate(game.mainline_moves()):
+                if ply >= min_ply:
+                    yield {"id": f"{n}.{ply}", "fen": board.fen(), "played": move.uci()}
+                board.push(move)
+
+def read_positions(path: str, min_ply: int = 0):
+    if path.lower().endswith(".pgn"):
+        return read_pgn(path, min_ply)
+    return read_epd(path)
+
+# ------------- workers -------------
+_worker = {}
+
+def _init_worker(tt_mb: int, core: str):
+    if core == "bitboard":
+        from chess_bitboard import BitboardSearch
+        _worker["search"] = BitboardSearch(TranspositionTable(tt_mb))
+    else:
+        _worker["search"] = Search(TranspositionTable(tt_mb))
+
+def analyze(task: dict, depth: int | None, movetime: float | None) -> dict:
+    """Search one position (the same search ai_best_move runs) and score it against bm/am."""
+    search = _worker["search"]
+    board = chess.Board(task["fen"])
+    t0 = time.perf_counter()
+    result = (0, None, None)
+    for result in search.iterate(board, depth, movetime):
+        pass
+    d, score, move = result
+    out = dict(task)
+    out.update(best=move.uci() if move else None, san=board.san(move) if move else None,
+               score=score, depth=d, nodes=search.nodes, time=round(time.perf_counter() - t0, 3))
+    if task.get("bm") or task.get("am"):
+        out["ok"] = (not task.get("bm") or out["best"] in task["bm"]) and out["best"] not in task.get("am", [])
+    return out
+
+# ------------- pipeline -------------
+def completed_lines(path: str) -> int:
+    """Number of finished result lines in `path`; a half-written last line is cut off."""
+    if not os.path.exists(path):
+        return 0
+    done, good = 0, 0
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            done += 1
+            good += len(line)
+    if good != os.path.getsize(path):
+        with open(path, "r+b") as f:
+            f.truncate(good)
+    return done
+
+def run(tasks, out_path: str, depth: int | None, movetime: float | None, workers: int,
+        skip: int = 0, tt_mb: int = TT_SIZE_MB, core: str = "board"):
+    """Analyze `tasks` (any iterable) into `out_path`; returns (positions, solved, with bm/am)."""
+    positions = solved = tested = 0
+    pending = {}          # future -> index
+    ready = {}            # index -> result, waiting for earlier ones
+    next_out = skip
+    t0 = time.perf_counter()
+    with open(out_path, "a") as out, \
+            ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(tt_mb, core)) as pool:
+
+        def collect(block: bool):
+            nonlocal next_out, positions, solved, tested
+            done, _ = wait(pending, timeout=None if block else 0, return_when=FIRST_COMPLETED)
+            for f in done:
+                ready[pending.pop(f)] = f.result()
+            while next_out in ready:
+                r = ready.pop(next_out)
+                r["index"] = next_out
+                out.write(json.dumps(r) + "\n")
+                next_out += 1
+                positions += 1
+                if "ok" in r:
+                    tested += 1
+                    solved += r["ok"]
+            out.flush()
+            if done:
+                rate = positions / (time.perf_counter() - t0)
+                score = f"  solved {solved}/{tested}" if tested else ""
+                print(f"\r{next_out} positions  {rate:.1f}/s{score}", end="", file=sys.stderr, flush=True)
+
+        for index, task in enumerate(tasks):
+            if index < skip:
+                continue
+            pending[pool.submit(analyze, task, depth, movetime)] = index
+            # ready results count too: one slow position must not let the
+            # ones after it pile up unwritten
+            while len(pending) + len(ready) >= workers * IN_FLIGHT:
+                collect(block=True)
+        while pending:
+            collect(block=True)
+    print(file=sys.stderr)
+    return positions, solved, tested
+
+def run_static(tasks, out_path: str, skip: int = 0, chunk: int = STATIC_CHUNK) -> int:
+    """Write the static evaluation of every task to `out_path`, `chunk`
+    positions per evaluate_many call; returns the number of positions."""
+    tasks = itertools.islice(tasks, skip, None)
+    positions = 0
+    t0 = time.perf_counter()
+    with open(out_path, "a") as out:
+        while batch := list(itertools.islice(tasks, chunk)):
+            scores = evaluate_many([chess.Board(t["fen"]) for t in batch])
+            for task, score in zip(batch, scores):
+                r = dict(task)
+                r.update(static=score, index=skip + positions)
+                out.write(json.dumps(r) + "\n")
+                positions += 1
+            out.flush()
+            rate = positions / (time.perf_counter() - t0)
+            print(f"\r{skip + positions} positions  {rate:.0f}/s", end="", file=sys.stderr, flush=True)
+    print(file=sys.stderr)
+    return positions
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Analyze every position of an EPD or PGN file.")
+    ap.add_argument("input", help=".epd/.fen (one position per line, bm/am/id ops) or .pgn")
+    ap.add_argument("--out", required=True, help="JSON-lines results file")
+    ap.add_argument("--depth", type=int)
+    ap.add_argument("--movetime", type=float, help="seconds per position")
+    ap.add_argument("--workers", type=int, default=mp.cpu_count())
+    ap.add_argument("--tt", type=int, default=TT_SIZE_MB, help="transposition table MB per worker")
+    ap.add_argument("--core", choices=["board", "bitboard"], default="board")
+    ap.add_argument("--min-ply", type=int, default=0, help="PGN: skip the first N plies of each game")
+    ap.add_argument("--resume", action="store_true", help="keep --out and skip positions already in it")
+    ap.add_argument("--static", action="store_true", help="static evaluation only, no search")
+    args = ap.parse_args(argv)
+    if args.depth is None and args.movetime is None:
+        args.depth = 4
+
+    skip = completed_lines(args.out) if args.resume else 0
+    if not args.resume:
+        open(args.out, "w").close()
+    elif skip:
+        print(f"resuming after {skip} positions", file=sys.stderr)
+    t0 = time.perf_counter()
+    if args.static:
+        positions = run_static(read_positions(args.input, args.min_ply), args.out, skip)
+        print(f"{positions} positions in {time.perf_counter() - t0:.1f} s")
+        return 0
+    positions, solved, tested = run(read_positions(args.input, args.min_ply), args.out, args.depth,
+                                    args.movetime, args.workers, skip, args.tt, args.core)
+    elapsed = time.perf_counter() - t0
+    print(f"{positions} positions in {elapsed:.1f} s")
+    if tested:
+        print(f"solved {solved}/{tested} ({solved / tested:.0%})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
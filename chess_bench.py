@@ -0,0 +1,252 @@
+# Headless benchmark / perft harness for chess_engine
+#
+#   python chess_bench.py search --depth 4                 nodes, NPS, time-to-depth, best move
+#   python chess_bench.py search --variant legacy-eval --variant default
+#   python chess_bench.py search --json new.json --compare old.json
+#   python chess_bench.py search --movetime 2 --variant plain --variant default   depth reached
+#   python chess_bench.py search --stats                   TT / cutoff / branching-factor counters
+#   python chess_bench.py profile --depth 5 --fen FEN      cProfile one search
+#   python chess_bench.py search --variant bitboard --variant default
+#   python chess_bench.py perft --depth 4                  move generation speed + correctness
+#   python chess_bench.py perft --core bitboard            same for chess_bitboard.Position
+#   python chess_bench.py parallel --depth 4 --workers 8   serial vs root-parallel speedup
+
+import argparse
+import json
+import multiprocessing as mp
+import sys
+import time
+
+import chess
+
+from chess_engine import (TT_SIZE_MB, LegacyEval, ParallelSearch, Search, SimpleOrderer,
+                          TranspositionTable, WorkerPool, format_stats, search_stats)
+from chess_eval import RichEvaluator
+
+# A few opening/middlegame/endgame positions for speed checks
+BENCH_FENS = [
+    chess.STARTING_FEN,
+    "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3",
+    "r1bq1rk1/pp2bppp/2n1pn2/3p4/2PP4/2N2N2/PP2BPPP/R2QKB1R w KQ - 0 8",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+]
+
+# Standard perft positions with known leaf counts for depths 1, 2, 3, ...
+PERFT_POSITIONS = [
+    (chess.STARTING_FEN, [20, 400, 8902, 197281, 4865609]),
+    ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", [48, 2039, 97862, 4085603]),
+    ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", [14, 191, 2812, 43238, 674624]),
+    ("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1", [6, 264, 9467, 422333]),
+]
+
+# name -> Search keyword arguments ("core" picks the search class instead)
+VARIANTS = {
+    "default": {},
+    "legacy-eval": dict(evaluator=LegacyEval),
+    "simple-order": dict(orderer=SimpleOrderer),
+    "no-qsearch": dict(quiescence=False),
+    "rich-eval": dict(evaluator=RichEvaluator),
+    "rich-no-qsearch": dict(evaluator=RichEvaluator, quiescence=False),
+    "no-nullmove": dict(null_move=False),
+    "no-lmr": dict(lmr=False),
+    "no-pvs": dict(pvs=False),
+    "no-aspiration": dict(aspiration=False),
+    "plain": dict(null_move=False, lmr=False, pvs=False, aspiration=False),
+    "bitboard": dict(core="bitboard"),
+    "bitboard-plain": dict(core="bitboard", null_move=False, lmr=False, pvs=False, aspiration=False),
+}
+
+def make_search(core: str = "board", **kwargs):
+    if core == "bitboard":
+        from chess_bitboard import BitboardSearch
+        return BitboardSearch(TranspositionTable(TT_SIZE_MB), **kwargs)
+    return Search(TranspositionTable(TT_SIZE_MB), **kwargs)
+
+def bench_position(fen: str, depth: int, movetime: float | None = None, **kwargs) -> dict:
+    search = make_search(**kwargs)
+    board = chess.Board(fen)
+    t0 = time.perf_counter()
+    depth_times, score, move = [], None, None
+    for _, score, move in search.iterate(board, depth, movetime):
+        depth_times.append(round(time.perf_counter() - t0, 4))
+    elapsed = time.perf_counter() - t0
+    return {
+        "fen": fen,
+        "best": move.uci() if move else None,
+        "score": score,
+        "nodes": search.nodes,
+        "time": round(elapsed, 4),
+        "nps": round(search.nodes / elapsed) if elapsed else 0,
+        "depth": len(depth_times),
+        "depth_times": depth_times,
+        "stats": search_stats(search),
+    }
+
+def run_search(fens: list, depth: int | None, variants: list, movetime: float | None = None) -> dict:
+    report = {"kind": "search", "depth": depth, "movetime": movetime, "variants": {}}
+    for name in variants:
+        rows = [bench_position(fen, depth, movetime, **VARIANTS[name]) for fen in fens]
+        nodes = sum(r["nodes"] for r in rows)
+        elapsed = sum(r["time"] for r in rows)
+        report["variants"][name] = {
+            "positions": rows,
+            "nodes": nodes,
+            "time": round(elapsed, 4),
+            "nps": round(nodes / elapsed) if elapsed else 0,
+            "mean_depth": round(sum(r["depth"] for r in rows) / len(rows), 2),
+        }
+    return report
+
+def print_search(report: dict, stats: bool = False):
+    for name, v in report["variants"].items():
+        limit = f"{report['movetime']} s/move" if report.get("movetime") else f"depth {report['depth']}"
+        print(f"== {name} ({limit})")
+        for r in v["positions"]:
+            ttd = " ".join(f"{t:.2f}" for t in r["depth_times"])
+            print(f"  {r['best'] or '-':<6} {r['score']!s:>7} {r['nodes']:>9} nodes "
+                  f"{r['time']:7.2f} s {r['nps']:>7} nps   ttd [{ttd}]  {r['fen']}")
+            if stats:
+                print(f"         {format_stats(r['stats'])}")
+        print(f"  total {v['nodes']:>9} nodes {v['time']:7.2f} s {v['nps']:>7} nps"
+              f"   mean depth {v.get('mean_depth', '-')}")
+
+def compare(report: dict, baseline: dict):
+    """Print NPS / node-count ratios and best-move changes against an older run."""
+    print(f"== compared with baseline (depth {baseline['depth']})")
+    for name, v in report["variants"].items():
+        old = baseline["variants"].get(name)
+        if old is None:
+            print(f"  {name}: not in baseline")
+            continue
+        old_rows = {r["fen"]: r for r in old["positions"]}
+        for r in v["positions"]:
+            o = old_rows.get(r["fen"])
+            if o is None: continue
+            flag = "" if o["best"] == r["best"] else f"  best {o['best']} -> {r['best']}"
+            print(f"  {name:<14} nps x{r['nps'] / max(1, o['nps']):5.2f}  "
+                  f"nodes x{r['nodes'] / max(1, o['nodes']):5.2f}{flag}  {r['fen']}")
+        print(f"  {name:<14} total nps x{v['nps'] / max(1, old['nps']):5.2f}  "
+              f"time x{v['time'] / max(1e-9, old['time']):5.2f}")
+
+def perft(board: chess.Board, depth: int) -> int:
+    if depth == 1:
+        return board.legal_moves.count()
+    n = 0
+    for m in board.legal_moves:
+        board.push(m)
+        n += perft(board, depth - 1)
+        board.pop()
+    return n
+
+def run_perft(depth: int, core: str = "board") -> dict:
+    if core == "bitboard":
+        from chess_bitboard import Position, perft as bb_perft
+        count = lambda board, d: bb_perft(Position.from_board(board), d)
+    else:
+        count = perft
+    rows = []
+    for fen, expected in PERFT_POSITIONS:
+        d = min(depth, len(expected))
+        t0 = time.perf_counter()
+        n = count(chess.Board(fen), d)
+        elapsed = time.perf_counter() - t0
+        rows.append({"fen": fen, "depth": d, "nodes": n, "expected": expected[d - 1],
+                     "ok": n == expected[d - 1], "time": round(elapsed, 4),
+                     "nps": round(n / elapsed) if elapsed else 0})
+    return {"kind": "perft", "depth": depth, "core": core, "positions": rows}
+
+def print_perft(report: dict):
+    for r in report["positions"]:
+        status = "ok" if r["ok"] else f"WRONG (expected {r['expected']})"
+        print(f"  d{r['depth']} {r['nodes']:>9} {r['time']:7.2f} s {r['nps']:>8} nps  {status}  {r['fen']}")
+
+def run_parallel(fens: list, depth: int, workers: int) -> dict:
+    """Serial Search vs ParallelSearch over `fens`. Both sides keep their
+    transposition tables (one for the serial search, one per worker) across
+    the positions and get the same depth-1 warm-up, as a game would."""
+    search = Search(TranspositionTable(TT_SIZE_MB))
+    search.best_move(chess.Board(), 1)
+    serial_nodes = 0
+    t0 = time.perf_counter()
+    for fen in fens:
+        search.best_move(chess.Board(fen), depth)
+        serial_nodes += search.nodes
+    serial = time.perf_counter() - t0
+    parallel_nodes = 0
+    with WorkerPool(workers) as pool:
+        ParallelSearch(pool).best_move(chess.Board(), 1)     # warm up the processes
+        t0 = time.perf_counter()
+        for fen in fens:
+            ps = ParallelSearch(pool)
+            ps.best_move(chess.Board(fen), depth)
+            parallel_nodes += ps.nodes
+        parallel = time.perf_counter() - t0
+    return {"kind": "parallel", "depth": depth, "workers": workers,
+            "serial": round(serial, 4), "parallel": round(parallel, 4),
+            "serial_nodes": serial_nodes, "parallel_nodes": parallel_nodes,
+            "speedup": round(serial / parallel, 3)}
+
+def profile_search(fen: str, depth: int | None, movetime: float | None, variant: str = "default",
+                   sort: str = "tottime", limit: int = 25):
+    """Run one search under cProfile and print the top functions."""
+    import cProfile
+    import pstats
+    profiler = cProfile.Profile()
+    row = profiler.runcall(bench_position, fen, depth, movetime, **VARIANTS[variant])
+    print(f"{row['best']} {row['score']}  {format_stats(row['stats'])}")
+    pstats.Stats(profiler).strip_dirs().sort_stats(sort).print_stats(limit)
+    return row
+
+def load_fens(path: str | None) -> list:
+    if path is None:
+        return BENCH_FENS
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark the chess engine without the GUI.")
+    ap.add_argument("mode", choices=["search", "perft", "parallel", "profile"])
+    ap.add_argument("--depth", type=int, default=None)
+    ap.add_argument("--movetime", type=float, help="search: seconds per position instead of a fixed depth")
+    ap.add_argument("--positions", help="file with one FEN per line (default: built-in set)")
+    ap.add_argument("--variant", action="append", choices=list(VARIANTS),
+                    help="search variant to run; repeat to compare (default: default)")
+    ap.add_argument("--workers", type=int, default=mp.cpu_count())
+    ap.add_argument("--core", choices=["board", "bitboard"], default="board",
+                    help="perft: move generator to test")
+    ap.add_argument("--stats", action="store_true", help="search: print search counters per position")
+    ap.add_argument("--fen", default=BENCH_FENS[2], help="profile: position to search")
+    ap.add_argument("--sort", default="tottime", help="profile: pstats sort key")
+    ap.add_argument("--json", help="write the report to this file")
+    ap.add_argument("--compare", help="earlier --json report to compare against")
+    args = ap.parse_args(argv)
+
+    if args.mode == "search":
+        depth = args.depth or (None if args.movetime else 4)
+        report = run_search(load_fens(args.positions), depth, args.variant or ["default"], args.movetime)
+        print_search(report, args.stats)
+        if args.compare:
+            with open(args.compare) as f:
+                compare(report, json.load(f))
+    elif args.mode == "profile":
+        report = profile_search(args.fen, args.depth or (None if args.movetime else 4), args.movetime,
+                                (args.variant or ["default"])[0], args.sort)
+    elif args.mode == "perft":
+        report = run_perft(args.depth or 3, args.core)
+        print_perft(report)
+    else:
+        report = run_parallel(load_fens(args.positions), args.depth or 4, args.workers)
+        print(f"serial {report['serial']:.2f} s {report['serial_nodes']} nodes   "
+              f"parallel x{report['workers']} {report['parallel']:.2f} s {report['parallel_nodes']} nodes   "
+              f"speedup {report['speedup']:.2f}x")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.mode == "perft" and not all(r["ok"] for r in report["positions"]):
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
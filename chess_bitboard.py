@@ -0,0 +1,649 @@
+# Compact bitboard position and search core for chess_engine
+#
+# chess.Board is general-purpose: every push allocates a Move and a board
+# state, and legal_moves builds generators and Move objects. Position keeps
+# the same information in a handful of ints and flat lists, encodes moves as
+# ints, and makes/unmakes moves in place with undo data in preallocated
+# per-ply slots. BitboardSearch runs the engine's alpha-beta on it and only
+# converts to/from chess.Board at the boundary (see ai_best_move(core=...)).
+#
+#   python chess_bench.py perft --core bitboard      move generation vs the known counts
+#   python chess_bench.py search --variant bitboard --variant default
+
+import time
+
+import chess
+import chess.polyglot
+
+from chess_engine import (CHECK_EVERY, DELTA_MARGIN, INF, MATE, MAX_PLY, MOBILITY, PIECE_SQ, TT_EXACT,
+                          TT_LOWER, TT_UPPER, VAL, AlphaBeta, TranspositionTable, score_from_tt,
+                          score_to_tt)
+
+# Attack tables. The slider tables are python-chess's occupancy-indexed
+# lookups: BB_DIAG_ATTACKS[sq][BB_DIAG_MASKS[sq] & occupied], etc.
+KNIGHT = chess.BB_KNIGHT_ATTACKS
+KING = chess.BB_KING_ATTACKS
+PAWN_ATTACKS = chess.BB_PAWN_ATTACKS          # [color][square]
+DIAG, DIAG_MASK = chess.BB_DIAG_ATTACKS, chess.BB_DIAG_MASKS
+RANK, RANK_MASK = chess.BB_RANK_ATTACKS, chess.BB_RANK_MASKS
+FILE, FILE_MASK = chess.BB_FILE_ATTACKS, chess.BB_FILE_MASKS
+
+PAWN, KNIGHT_T, BISHOP, ROOK, QUEEN, KING_T = range(1, 7)
+WHITE, BLACK = 1, 0
+
+# Move = from | to << 6 | promotion << 12 | flag << 15
+NORMAL, DOUBLE, EN_PASSANT, CASTLE = 0, 1, 2, 3
+
+# Castling rights bits and which squares clear them when touched
+WK, WQ, BK, BQ = 1, 2, 4, 8
+CASTLE_CLEAR = [0] * 64
+CASTLE_CLEAR[chess.E1] = WK | WQ
+CASTLE_CLEAR[chess.H1] = WK
+CASTLE_CLEAR[chess.A1] = WQ
+CASTLE_CLEAR[chess.E8] = BK | BQ
+CASTLE_CLEAR[chess.H8] = BK
+CASTLE_CLEAR[chess.A8] = BQ
+
+# Polyglot Zobrist keys, so Position.key == chess.polyglot.zobrist_hash(board)
+RND = chess.polyglot.POLYGLOT_RANDOM_ARRAY
+PIECE_KEY = [[0] * 64 for _ in range(16)]     # [piece code][square]
+for _pt in range(1, 7):
+    for _c in (BLACK, WHITE):
+        PIECE_KEY[_pt | _c << 3] = [RND[64 * ((_pt - 1) * 2 + _c) + sq] for sq in range(64)]
+CASTLE_KEY = [0] * 16
+for _r in range(16):
+    for _bit in range(4):
+        if _r >> _bit & 1:
+            CASTLE_KEY[_r] ^= RND[768 + _bit]
+EP_KEY = [RND[772 + f] for f in range(8)]
+TURN_KEY = RND[780]
+
+# Material + PST per piece code, White-positive (same numbers as Evaluator)
+PSQ = [[0] * 64 for _ in range(16)]
+for (_pt, _color), _values in PIECE_SQ.items():
+    PSQ[_pt | int(_color) << 3] = _values
+MVV = [0, VAL[chess.PAWN], VAL[chess.KNIGHT], VAL[chess.BISHOP], VAL[chess.ROOK], VAL[chess.QUEEN], 0]
+
+def lsb(b: int) -> int:
+    return (b & -b).bit_length() - 1
+
+class Position:
+    """Bitboard chess position with in-place make/unmake.
+
+    bb[piece code] is a bitboard per piece (code = type | color << 3,
+    White = 1), occ[color] per side, sq[] the piece code on each square.
+    key is the Polyglot Zobrist hash and psq the material + PST score,
+    both updated incrementally. Undo data lives in per-ply slots that are
+    allocated once, so make/unmake don't build any objects.
+    """
+    __slots__ = ("bb", "occ", "occupied", "sq", "turn", "castling", "ep", "halfmove",
+                 "key", "psq", "ply", "u_move", "u_cap", "u_castling", "u_ep", "u_half", "u_key", "u_psq")
+
+    def __init__(self):
+        self.bb = [0] * 16
+        self.occ = [0, 0]
+        self.occupied = 0
+        self.sq = [0] * 64
+        self.turn = WHITE
+        self.castling = 0
+        self.ep = -1
+        self.halfmove = 0
+        self.key = 0
+        self.psq = 0
+        self.ply = 0
+        n = MAX_PLY + 8
+        self.u_move, self.u_cap, self.u_castling = [0] * n, [0] * n, [0] * n
+        self.u_ep, self.u_half, self.u_key, self.u_psq = [0] * n, [0] * n, [0] * n, [0] * n
+
+    # ---------- conversion ----------
+    @classmethod
+    def from_board(cls, board: chess.Board) -> "Position":
+        p = cls()
+        for square, piece in board.piece_map().items():
+            p.put(piece.piece_type | int(piece.color) << 3, square)
+        p.turn = int(board.turn)
+        p.castling = ((WK if board.has_kingside_castling_rights(chess.WHITE) else 0) |
+                      (WQ if board.has_queenside_castling_rights(chess.WHITE) else 0) |
+                      (BK if board.has_kingside_castling_rights(chess.BLACK) else 0) |
+                      (BQ if board.has_queenside_castling_rights(chess.BLACK) else 0))
+        p.ep = board.ep_square if board.ep_square is not None else -1
+        p.halfmove = board.halfmove_clock
+        p.key ^= CASTLE_KEY[p.castling] ^ p.ep_key() ^ (TURN_KEY if p.turn else 0)
+        return p
+
+    def to_board(self) -> chess.Board:
+        b = chess.Board(None)
+        for square in range(64):
+            pc = self.sq[square]
+            if pc:
+                b.set_piece_at(square, chess.Piece(pc & 7, bool(pc >> 3)))
+        b.turn = bool(self.turn)
+        fen = "".join(c for bit, c in ((WK, "K"), (WQ, "Q"), (BK, "k"), (BQ, "q")) if self.castling & bit)
+        b.set_castling_fen(fen or "-")
+        b.ep_square = self.ep if self.ep >= 0 else None
+        b.halfmove_clock = self.halfmove
+        return b
+
+    def to_move(self, m: int) -> chess.Move:
+        return chess.Move(m & 63, m >> 6 & 63, (m >> 12 & 7) or None)
+
+    def from_move(self, move: chess.Move) -> int:
+        fr, to = move.from_square, move.to_square
+        pt = self.sq[fr] & 7
+        flag = NORMAL
+        if pt == KING_T and abs(to - fr) == 2:
+            flag = CASTLE
+        elif pt == PAWN and to == self.ep:
+            flag = EN_PASSANT
+        elif pt == PAWN and abs(to - fr) == 16:
+            flag = DOUBLE
+        return fr | to << 6 | (move.promotion or 0) << 12 | flag << 15
+
+    # ---------- piece bookkeeping ----------
+    def put(self, pc: int, s: int):
+        bit = 1 << s
+        self.bb[pc] |= bit
+        self.occ[pc >> 3] |= bit
+        self.occupied |= bit
+        self.sq[s] = pc
+        self.key ^= PIECE_KEY[pc][s]
+        self.psq += PSQ[pc][s]
+
+    def remove(self, pc: int, s: int):
+        bit = ~(1 << s)
+        self.bb[pc] &= bit
+        self.occ[pc >> 3] &= bit
+        self.occupied &= bit
+        self.sq[s] = 0
+        self.key ^= PIECE_KEY[pc][s]
+        self.psq -= PSQ[pc][s]
+
+    def ep_key(self) -> int:
+        # Polyglot only hashes the ep file if a pawn could capture there
+        if self.ep >= 0 and PAWN_ATTACKS[self.turn ^ 1][self.ep] & self.bb[PAWN | self.turn << 3]:
+            return EP_KEY[self.ep & 7]
+        return 0
+
+    # ---------- attacks ----------
+    def attacked(self, s: int, by: int) -> bool:
+        bb, occ = self.bb, self.occupied
+        c = by << 3
+        if KNIGHT[s] & bb[KNIGHT_T | c] or KING[s] & bb[KING_T | c]:
+            return True
+        if PAWN_ATTACKS[by ^ 1][s] & bb[PAWN | c]:
+            return True
+        queens = bb[QUEEN | c]
+        if DIAG[s][DIAG_MASK[s] & occ] & (bb[BISHOP | c] | queens):
+            return True
+        return bool((RANK[s][RANK_MASK[s] & occ] | FILE[s][FILE_MASK[s] & occ]) & (bb[ROOK | c] | queens))
+
+    def in_check(self) -> bool:
+        return self.attacked(lsb(self.bb[KING_T | self.turn << 3]), self.turn ^ 1)
+
+    def insufficient_material(self) -> bool:
+        """Same test as chess_engine.insufficient_material."""
+        bb = self.bb
+        return (not (bb[PAWN] | bb[PAWN | 8] | bb[ROOK] | bb[ROOK | 8] | bb[QUEEN] | bb[QUEEN | 8])
+                and self.occupied.bit_count() <= 3)
+
+    def mobility(self) -> int:
+        """Same pseudo-legal mobility term as chess_engine.mobility."""
+        occ = self.occupied
+        score = 0
+        for color, sign in ((WHITE, 1), (BLACK, -1)):
+            c = color << 3
+            free = ~self.occ[color]
+            n = 0
+            b = self.bb[KNIGHT_T | c]
+            while b:
+                low = b & -b; s = low.bit_length() - 1; b ^= low
+                n += (KNIGHT[s] & free).bit_count()
+            queens = self.bb[QUEEN | c]
+            b = self.bb[BISHOP | c] | queens
+            while b:
+                low = b & -b; s = low.bit_length() - 1; b ^= low
+                n += (DIAG[s][DIAG_MASK[s] & occ] & free).bit_count()
+            b = self.bb[ROOK | c] | queens
+            while b:
+                low = b & -b; s = low.bit_length() - 1; b ^= low
+                n += ((RANK[s][RANK_MASK[s] & occ] | FILE[s][FILE_MASK[s] & occ]) & free).bit_count()
+            score += sign * n
+        return score
+
+    # ---------- move generation ----------
+    def moves(self, out: list, captures_only: bool = False):
+        """Append pseudo-legal moves (int-encoded) to `out`."""
+        us = self.turn
+        c = us << 3
+        bb, occ = self.bb, self.occupied
+        own, enemy = self.occ[us], self.occ[us ^ 1]
+        targets = enemy if captures_only else ~own & 0xFFFF_FFFF_FFFF_FFFF
+        append = out.append
+
+        # pawns
+        pawns = bb[PAWN | c]
+        if us == WHITE:
+            step, promo_rank = 8, 0xFF00_0000_0000_0000
+            single = (pawns << 8) & ~occ & 0xFFFF_FFFF_FFFF_FFFF
+            double = ((single & 0x0000_0000_00FF_0000) << 8) & ~occ
+        else:
+            step, promo_rank = -8, 0x0000_0000_0000_00FF
+            single = (pawns >> 8) & ~occ
+            double = ((single & 0x0000_FF00_0000_0000) >> 8) & ~occ
+        if captures_only:
+            single &= promo_rank          # quiet queen promotions still count as tactical
+            double = 0
+        b = single
+        while b:
+            low = b & -b; to = low.bit_length() - 1; b ^= low
+            fr = to - step
+            if (1 << to) & promo_rank:
+                append(fr | to << 6 | QUEEN << 12)
+                if not captures_only:
+                    for promo in (KNIGHT_T, ROOK, BISHOP):
+                        append(fr | to << 6 | promo << 12)
+            else:
+                append(fr | to << 6)
+        b = double
+        while b:
+            low = b & -b; to = low.bit_length() - 1; b ^= low
+            append((to - 2 * step) | to << 6 | DOUBLE << 15)
+        b = pawns
+        while b:
+            low = b & -b; fr = low.bit_length() - 1; b ^= low
+            att = PAWN_ATTACKS[us][fr]
+            caps = att & enemy
+            while caps:
+                low = caps & -caps; to = low.bit_length() - 1; caps ^= low
+                if (1 << to) & promo_rank:
+                    for promo in (QUEEN, KNIGHT_T, ROOK, BISHOP):
+                        append(fr | to << 6 | promo << 12)
+                else:
+                    append(fr | to << 6)
+            if self.ep >= 0 and att & (1 << self.ep):
+                append(fr | self.ep << 6 | EN_PASSANT << 15)
+
+        # pieces
+        b = bb[KNIGHT_T | c]
+        while b:
+            low = b & -b; fr = low.bit_length() - 1; b ^= low
+            t = KNIGHT[fr] & targets
+            while t:
+                low = t & -t; to = low.bit_length() - 1; t ^= low
+                append(fr | to << 6)
+        queens = bb[QUEEN | c]
+        b = bb[BISHOP | c] | queens
+        while b:
+            low = b & -b; fr = low.bit_length() - 1; b ^= low
+            t = DIAG[fr][DIAG_MASK[fr] & occ] & targets
+            while t:
+                low = t & -t; to = low.bit_length() - 1; t ^= low
+                append(fr | to << 6)
+        b = bb[ROOK | c] | queens
+        while b:
+            low = b & -b; fr = low.bit_length() - 1; b ^= low
+            t = (RANK[fr][RANK_MASK[fr] & occ] | FILE[fr][FILE_MASK[fr] & occ]) & targets
+            while t:
+                low = t & -t; to = low.bit_length() - 1; t ^= low
+                append(fr | to << 6)
+        fr = lsb(bb[KING_T | c])
+        t = KING[fr] & targets
+        while t:
+            low = t & -t; to = low.bit_length() - 1; t ^= low
+            append(fr | to << 6)
+
+        # castling (the king's destination is checked by make)
+        if not captures_only and self.castling:
+            them = us ^ 1
+            if us == WHITE:
+                if self.castling & WK and not occ & 0x60 and not self.attacked(4, them) and not self.attacked(5, them):
+                    append(4 | 6 << 6 | CASTLE << 15)
+                if self.castling & WQ and not occ & 0x0E and not self.attacked(4, them) and not self.attacked(3, them):
+                    append(4 | 2 << 6 | CASTLE << 15)
+            else:
+                if self.castling & BK and not occ & (0x60 << 56) and not self.attacked(60, them) and not self.attacked(61, them):
+                    append(60 | 62 << 6 | CASTLE << 15)
+                if self.castling & BQ and not occ & (0x0E << 56) and not self.attacked(60, them) and not self.attacked(59, them):
+                    append(60 | 58 << 6 | CASTLE << 15)
+
+    # ---------- make / unmake ----------
+    def make(self, m: int) -> bool:
+        """Play `m`; returns False (with the move already undone) if it
+        leaves the mover's king in check."""
+        fr, to = m & 63, m >> 6 & 63
+        promo, flag = m >> 12 & 7, m >> 15
+        us = self.turn
+        pc = self.sq[fr]
+        cap = self.sq[to]
+
+        i = self.ply
+        self.u_move[i], self.u_cap[i], self.u_castling[i] = m, cap, self.castling
+        self.u_ep[i], self.u_half[i], self.u_key[i], self.u_psq[i] = self.ep, self.halfmove, self.key, self.psq
+        self.ply = i + 1
+
+        # the common part (from -> to, capture, promotion) inlined; castling
+        # and en passant go through put/remove
+        key = self.key ^ CASTLE_KEY[self.castling] ^ self.ep_key()
+        bb, occ, board = self.bb, self.occ, self.sq
+        them = us ^ 1
+        new = (promo | us << 3) if promo else pc
+        fbit, tbit = 1 << fr, 1 << to
+        bb[pc] ^= fbit
+        bb[new] |= tbit
+        occ[us] ^= fbit | tbit
+        board[fr], board[to] = 0, new
+        key ^= PIECE_KEY[pc][fr] ^ PIECE_KEY[new][to]
+        psq = self.psq - PSQ[pc][fr] + PSQ[new][to]
+        if cap:
+            bb[cap] ^= tbit
+            occ[them] ^= tbit
+            key ^= PIECE_KEY[cap][to]
+            psq -= PSQ[cap][to]
+        self.occupied = occ[0] | occ[1]
+        self.key, self.psq = key, psq
+        if flag == EN_PASSANT:
+            self.remove(PAWN | them << 3, to - 8 if us == WHITE else to + 8)
+        elif flag == CASTLE:
+            rook = ROOK | us << 3
+            if to > fr:
+                self.remove(rook, to + 1); self.put(rook, to - 1)
+            else:
+                self.remove(rook, to - 2); self.put(rook, to + 1)
+
+        self.castling &= ~(CASTLE_CLEAR[fr] | CASTLE_CLEAR[to])
+        self.ep = (fr + to) >> 1 if flag == DOUBLE else -1
+        self.halfmove = 0 if cap or pc & 7 == PAWN else self.halfmove + 1
+        self.turn = us ^ 1
+        self.key ^= CASTLE_KEY[self.castling] ^ self.ep_key() ^ TURN_KEY
+
+        if self.attacked((bb[KING_T | us << 3]).bit_length() - 1, them):
+            self.unmake()
+            return False
+        return True
+
+    def unmake(self):
+        i = self.ply - 1
+        self.ply = i
+        m = self.u_move[i]
+        fr, to = m & 63, m >> 6 & 63
+        promo, flag = m >> 12 & 7, m >> 15
+        us = self.turn ^ 1
+        self.turn = us
+        # key and psq are restored from the undo slot, so only the boards move
+        bb, occ, board = self.bb, self.occ, self.sq
+        moved = board[to]
+        pc = PAWN | us << 3 if promo else moved
+        fbit, tbit = 1 << fr, 1 << to
+        bb[moved] ^= tbit
+        bb[pc] |= fbit
+        occ[us] ^= fbit | tbit
+        board[fr], board[to] = pc, 0
+        cap = self.u_cap[i]
+        if cap:
+            bb[cap] |= tbit
+            occ[us ^ 1] |= tbit
+            board[to] = cap
+        if flag == EN_PASSANT:
+            s = to - 8 if us == WHITE else to + 8
+            bb[PAWN | (us ^ 1) << 3] |= 1 << s
+            occ[us ^ 1] |= 1 << s
+            board[s] = PAWN | (us ^ 1) << 3
+        elif flag == CASTLE:
+            rook = ROOK | us << 3
+            a, b = (to - 1, to + 1) if to > fr else (to + 1, to - 2)
+            bb[rook] ^= 1 << a | 1 << b
+            occ[us] ^= 1 << a | 1 << b
+            board[a], board[b] = 0, rook
+        self.occupied = occ[0] | occ[1]
+        self.castling, self.ep, self.halfmove = self.u_castling[i], self.u_ep[i], self.u_half[i]
+        self.key, self.psq = self.u_key[i], self.u_psq[i]
+
+    def make_null(self):
+        i = self.ply
+        self.u_move[i], self.u_cap[i], self.u_castling[i] = 0, 0, self.castling
+        self.u_ep[i], self.u_half[i], self.u_key[i], self.u_psq[i] = self.ep, self.halfmove, self.key, self.psq
+        self.ply = i + 1
+        self.key ^= self.ep_key()
+        self.ep = -1
+        self.turn ^= 1
+        self.key ^= TURN_KEY
+
+    def unmake_null(self):
+        i = self.ply - 1
+        self.ply = i
+        self.turn ^= 1
+        self.castling, self.ep, self.halfmove = self.u_castling[i], self.u_ep[i], self.u_half[i]
+        self.key, self.psq = self.u_key[i], self.u_psq[i]
+
+    def legal_moves(self) -> list:
+        out, legal = [], []
+        self.moves(out)
+        for m in out:
+            if self.make(m):
+                self.unmake()
+                legal.append(m)
+        return legal
+
+    def evaluate(self) -> int:
+        score = self.psq + MOBILITY * self.mobility()
+        return score if self.turn == WHITE else -score
+
+def perft(pos: Position, depth: int) -> int:
+    moves = []
+    pos.moves(moves)
+    n = 0
+    for m in moves:
+        if pos.make(m):
+            n += 1 if depth == 1 else perft(pos, depth - 1)
+            pos.unmake()
+    return n
+
+# ------------- search -------------
+class BitboardSearch(AlphaBeta):
+    """The engine's search (TT, iterative deepening, MVV-LVA / killer /
+    history ordering, quiescence) running on Position instead of chess.Board.
+
+    Takes and returns python-chess objects, so it is a drop-in for Search:
+    `iterate(board, max_depth, movetime)` yields (depth, score, chess.Move).
+    The root search, aspiration windows, iterative deepening and pruning
+    rules are AlphaBeta's, shared with Search; only negamax and quiesce are
+    written against Position. The transposition table holds int moves, so
+    don't share it with Search.
+    """
+    def __init__(self, tt: TranspositionTable | None = None, quiescence: bool = True,
+                 null_move: bool = True, lmr: bool = True, pvs: bool = True, aspiration: bool = True):
+        super().__init__(tt, quiescence, null_move, lmr, pvs, aspiration)
+        self.killers = [[0, 0] for _ in range(MAX_PLY)]
+        self.history = [[0] * 4096, [0] * 4096]
+
+    def make(self, pos: Position, m: int) -> bool:
+        return pos.make(m)
+
+    def unmake(self, pos: Position):
+        pos.unmake()
+
+    def key(self, pos: Position) -> int:
+        return pos.key
+
+    def ordered(self, pos: Position, ply: int, tt_move: int) -> list:
+        moves = []
+        pos.moves(moves)
+        sq = pos.sq
+        k0, k1 = self.killers[ply] if ply < MAX_PLY else (0, 0)
+        hist = self.history[pos.turn]
+        scored = []
+        for m in moves:
+            if m == tt_move:
+                s = 1 << 30
+            else:
+                victim = sq[m >> 6 & 63] & 7
+                if m >> 12 & 7:
+                    s = 1 << 28
+                elif victim or m >> 15 == EN_PASSANT:
+                    s = (1 << 27) + 10 * (victim or PAWN) - (sq[m & 63] & 7)
+                elif m == k0:
+                    s = 1 << 26
+                elif m == k1:
+                    s = (1 << 26) - 1
+                else:
+                    s = hist[m & 4095]
+            scored.append((s, m))
+        scored.sort(reverse=True)
+        return scored
+
+    def negamax(self, pos: Position, depth: int, alpha: int, beta: int, ply: int,
+                null_ok: bool = True) -> int:
+        if pos.insufficient_material():
+            self.nodes += 1
+            return 0
+        if depth <= 0:
+            if self.quiescence:
+                return self.quiesce(pos, alpha, beta, ply)
+            self.nodes += 1
+            return pos.evaluate()
+        self.nodes += 1
+        if self.nodes % CHECK_EVERY == 0:
+            self.check_time()
+        tt = self.tt
+        alpha0 = alpha
+        tt_move = 0
+        if tt is not None:
+            hit = tt.probe(pos.key)
+            self.tt_probes += 1
+            if hit is not None:
+                self.tt_hits += 1
+                _, d, s, flag, tt_move, _ = hit
+                s = score_from_tt(s, ply)
+                if d >= depth:
+                    if (flag == TT_EXACT or flag == TT_LOWER and s >= beta
+                            or flag == TT_UPPER and s <= alpha):
+                        self.tt_cutoffs += 1
+                        return s
+                tt_move = tt_move or 0
+
+        # 50-move draw, unless it is mate on the board (as in Search.negamax)
+        if pos.halfmove >= 100 and pos.legal_moves():
+            return 0
+
+        in_check = pos.in_check()
+        us = pos.turn << 3
+        r = self.null_reduction(depth, alpha, beta, null_ok, in_check)
+        if (r and pos.occ[pos.turn] & ~(pos.bb[PAWN | us] | pos.bb[KING_T | us])
+                and pos.evaluate() >= beta):
+            pos.make_null()
+            try:
+                score = -self.negamax(pos, depth - 1 - r, -beta, -beta + 1, ply + 1, False)
+            finally:
+                pos.unmake_null()
+            if score >= beta:
+                return beta
+
+        best, best_move = -INF, 0
+        i = 0
+        for _, m in self.ordered(pos, ply, tt_move):
+            r = self.reduction(i, depth, in_check)
+            if r and (pos.sq[m >> 6 & 63] or m >> 12 & 7 or m >> 15 == EN_PASSANT):
+                r = 0
+            if not pos.make(m):
+                continue
+            try:
+                if i == 0:
+                    score = -self.negamax(pos, depth - 1, -beta, -alpha, ply + 1)
+                else:
+                    if r and pos.in_check():
+                        r = 0
+                    bound = alpha + 1 if self.pvs else beta
+                    score = -self.negamax(pos, depth - 1 - r, -bound, -alpha, ply + 1)
+                    if r and score > alpha:
+                        score = -self.negamax(pos, depth - 1, -bound, -alpha, ply + 1)
+                    if self.pvs and alpha < score < beta:
+                        score = -self.negamax(pos, depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                pos.unmake()
+            i += 1
+            if score > best:
+                best, best_move = score, m
+            if best > alpha:
+                alpha = best
+            if alpha >= beta:
+                self.cutoffs += 1
+                self.first_cutoffs += i == 1
+                if not pos.sq[m >> 6 & 63] and not m >> 12 & 7 and m >> 15 != EN_PASSANT:
+                    if ply < MAX_PLY and self.killers[ply][0] != m:
+                        self.killers[ply] = [m, self.killers[ply][0]]
+                    self.history[pos.turn][m & 4095] += depth * depth
+                break
+
+        if best_move == 0:
+            return -MATE + ply if in_check else 0
+        if tt is not None:
+            flag = TT_UPPER if best <= alpha0 else TT_LOWER if best >= beta else TT_EXACT
+            tt.store(pos.key, depth, score_to_tt(best, ply), flag, best_move)
+        return best
+
+    def quiesce(self, pos: Position, alpha: int, beta: int, ply: int) -> int:
+        self.nodes += 1
+        self.qnodes += 1
+        if self.nodes % CHECK_EVERY == 0:
+            self.check_time()
+        if ply >= MAX_PLY - 1:
+            return pos.evaluate()
+        if pos.insufficient_material():
+            return 0
+        in_check = pos.in_check()
+        if in_check:
+            best = -INF
+            moves = self.ordered(pos, ply, 0)
+        else:
+            best = pos.evaluate()
+            if best >= beta:
+                return best
+            if best + MVV[QUEEN] + DELTA_MARGIN < alpha:
+                return best
+            alpha = max(alpha, best)
+            caps = []
+            pos.moves(caps, captures_only=True)
+            sq = pos.sq
+            moves = sorted(((10 * ((sq[m >> 6 & 63] & 7) or PAWN) - (sq[m & 63] & 7) + (1000 if m >> 12 & 7 else 0), m)
+                            for m in caps), reverse=True)
+
+        for _, m in moves:
+            if not in_check and not m >> 12 & 7:
+                if best + MVV[(pos.sq[m >> 6 & 63] & 7) or PAWN] + DELTA_MARGIN <= alpha:
+                    continue
+            if not pos.make(m):
+                continue
+            try:
+                score = -self.quiesce(pos, -beta, -alpha, ply + 1)
+            finally:
+                pos.unmake()
+            if score > best:
+                best = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        if best == -INF:
+            return -MATE + ply
+        return best
+
+    def iterate(self, board: chess.Board, max_depth: int | None = None,
+                movetime: float | None = None):
+        """Yield (depth, score, chess.Move) for each completed iteration."""
+        start = time.perf_counter()
+        self.reset_stats()
+        self.deadline = None
+        self.killers = [[0, 0] for _ in range(MAX_PLY)]
+        for table in self.history:           # keep the trend, forget the magnitude
+            for i, h in enumerate(table):
+                if h: table[i] = h >> 1
+        pos = Position.from_board(board)
+        if self.tt is not None:
+            self.tt.new_search()
+            hit = self.tt.probe(pos.key)
+        else:
+            hit = None
+        root = [m for _, m in self.ordered(pos, 0, hit[4] if hit else 0)]
+        root = [m for m in root if pos.make(m) and (pos.unmake() or True)]
+        for depth, score, m in self.deepen(pos, root, start, max_depth, movetime):
+            yield depth, score, pos.to_move(m)
@@ -0,0 +1,238 @@
+# Opening book and endgame tables that answer before the engine searches
+#
+# Anything with a `probe(board) -> chess.Move | None` method is a book; Books
+# chains several and returns the first hit. ai_best_move(book=...) and the GUI
+# ask the book first and only search when it has nothing.
+#
+#   python chess_book.py build        regenerate endgames/*.bin (KQK, KRK)
+#   python chess_book.py probe FEN    show what the books say about a position
+
+import os
+import sys
+import zlib
+
+import chess
+import chess.polyglot
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BOOK = os.path.join(HERE, "book.bin")
+ENDGAME_DIR = os.path.join(HERE, "endgames")
+
+# ------------- opening book -------------
+class PolyglotBook:
+    """Polyglot .bin opening book.
+
+    python-chess's reader memory-maps the file and binary-searches the
+    16-byte entries (sorted by Zobrist key), so a lookup touches only a few
+    pages however large the book is. Moves are picked at random in
+    proportion to their weight, or always the heaviest if `best` is set.
+    """
+    def __init__(self, path: str, best: bool = False, min_weight: int = 1):
+        self.reader = chess.polyglot.open_reader(path)
+        self.best = best
+        self.min_weight = min_weight
+
+    def probe(self, board: chess.Board) -> chess.Move | None:
+        try:
+            if self.best:
+                return self.reader.find(board, minimum_weight=self.min_weight).move
+            return self.reader.weighted_choice(board).move
+        except IndexError:
+            return None
+
+    def close(self):
+        self.reader.close()
+
+# ------------- endgame tables -------------
+# One table per "king + piece vs lone king" ending, with the strong side as
+# White (positions with a strong Black are mirrored). Index = wk*4096 +
+# piece*64 + bk; the first 262144 bytes are White to move, the next Black to
+# move. A byte is plies-to-mate + 1, or 0 for draws and illegal positions.
+TABLE_SIZE = 64 * 64 * 64
+ENDGAMES = {"KQK": chess.QUEEN, "KRK": chess.ROOK}
+
+def _king_moves():
+    return [[t for t in chess.SQUARES if t != s and chess.square_distance(s, t) == 1]
+            for s in chess.SQUARES]
+
+def _rays(piece_type: int):
+    dirs = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+    if piece_type == chess.QUEEN:
+        dirs += [(1, 1), (1, -1), (-1, 1), (-1, -1)]
+    rays = []
+    for sq in chess.SQUARES:
+        f0, r0 = chess.square_file(sq), chess.square_rank(sq)
+        per_sq = []
+        for df, dr in dirs:
+            ray, f, r = [], f0 + df, r0 + dr
+            while 0 <= f < 8 and 0 <= r < 8:
+                ray.append(chess.square(f, r))
+                f, r = f + df, r + dr
+            if ray:
+                per_sq.append(ray)
+        rays.append(per_sq)
+    return rays
+
+def build_table(piece_type: int) -> bytearray:
+    """Retrograde analysis of K+piece vs K; returns the 2*TABLE_SIZE table."""
+    KM = _king_moves()
+    rays = _rays(piece_type)
+    adjacent = [set(m) | {s} for s, m in enumerate(KM)]
+
+    def attacks(p, target, blocker):
+        # does the piece on p hit `target`, with the white king as the only blocker
+        for ray in rays[p]:
+            for t in ray:
+                if t == target: return True
+                if t == blocker: break
+        return False
+
+    def slides(p, wk, bk):
+        for ray in rays[p]:
+            for t in ray:
+                if t == wk or t == bk: break
+                yield t
+
+    W = bytearray(TABLE_SIZE)          # white to move
+    B = bytearray(TABLE_SIZE)          # black to move
+    escapes = [0] * TABLE_SIZE         # black moves not yet known to lose
+    frontier = []
+
+    for wk in chess.SQUARES:
+        for p in chess.SQUARES:
+            if p == wk: continue
+            for bk in chess.SQUARES:
+                if bk == p or bk in adjacent[wk]: continue
+                idx = wk * 4096 + p * 64 + bk
+                check = attacks(p, bk, wk)
+                n, drawn = 0, False
+                for t in KM[bk]:
+                    if t in adjacent[wk]: continue
+                    if t == p:
+                        drawn = True          # undefended piece: capture it
+                        break
+                    if attacks(p, t, wk): continue
+                    n += 1
+                if drawn:
+                    escapes[idx] = -1
+                elif n == 0:
+                    if check:
+                        B[idx] = 1            # mated: 0 plies + 1
+                        frontier.append(idx)
+                    # else stalemate: stays 0
+                else:
+                    escapes[idx] = n
+
+    ply = 0
+    while frontier:
+        # white moves into a lost black-to-move position -> win in ply+1
+        wins = []
+        for idx in frontier:
+            wk, p, bk = idx // 4096, (idx // 64) % 64, idx % 64
+            for f in KM[wk]:                        # king came from f
+                if f == p or f in adjacent[bk]: continue
+                w = f * 4096 + p * 64 + bk
+                if not W[w] and not attacks(p, bk, f):
+                    W[w] = ply + 2
+                    wins.append(w)
+            for f in slides(p, wk, bk):             # piece came from f
+                w = wk * 4096 + f * 64 + bk
+                if not W[w] and not attacks(f, bk, wk):
+                    W[w] = ply + 2
+                    wins.append(w)
+        ply += 1
+        # black moves into a won white-to-move position; lost once none are left
+        frontier = []
+        for w in wins:
+            wk, p, bk = w // 4096, (w // 64) % 64, w % 64
+            for f in KM[bk]:                        # black king came from f
+                if f == p or f in adjacent[wk]: continue
+                b = wk * 4096 + p * 64 + f
+                if escapes[b] > 0:
+                    escapes[b] -= 1
+                    if escapes[b] == 0:
+                        B[b] = ply + 2
+                        frontier.append(b)
+        ply += 1
+    return W + B
+
+class EndgameTable:
+    """Exact play for KQK and KRK from the precomputed tables in endgames/.
+
+    The strong side picks the move that mates fastest, the lone king the
+    one that lasts longest; positions that aren't a forced win (the lone
+    king can take the piece, stalemate) return None and go to the search.
+    """
+    def __init__(self, directory: str = ENDGAME_DIR):
+        self.tables = {}
+        for name, pt in ENDGAMES.items():
+            path = os.path.join(directory, name.lower() + ".bin")
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    self.tables[pt] = zlib.decompress(f.read())
+
+    def dtm(self, board: chess.Board) -> int | None:
+        """Plies to mate for the position (None if not in a loaded table or not won)."""
+        if chess.popcount(board.occupied) != 3 or board.pawns:
+            return None
+        strong = chess.WHITE if chess.popcount(board.occupied_co[chess.WHITE]) == 2 else chess.BLACK
+        if strong == chess.BLACK:
+            board = board.mirror()
+        wk = board.king(chess.WHITE)
+        bk = board.king(chess.BLACK)
+        p = chess.lsb(board.occupied_co[chess.WHITE] & ~board.kings)
+        table = self.tables.get(board.piece_type_at(p))
+        if table is None:
+            return None
+        v = table[(0 if board.turn == chess.WHITE else TABLE_SIZE) + wk * 4096 + p * 64 + bk]
+        return v - 1 if v else None
+
+    def probe(self, board: chess.Board) -> chess.Move | None:
+        if not self.tables or self.dtm(board) is None:
+            return None
+        best, best_d = None, None
+        for m in board.legal_moves:
+            board.push(m)
+            d = self.dtm(board)
+            board.pop()
+            if d is None: continue
+            # after the strong side moves, smaller is better; for the lone king, larger
+            if best is None or (d < best_d if d % 2 == 0 else d > best_d):
+                best, best_d = m, d
+        return best
+
+class Books:
+    """Asks each book in turn; the first move found wins."""
+    def __init__(self, *books):
+        self.books = [b for b in books if b is not None]
+
+    def probe(self, board: chess.Board) -> chess.Move | None:
+        for book in self.books:
+            move = book.probe(board)
+            if move is not None and move in board.legal_moves:
+                return move
+        return None
+
+def default_books() -> Books:
+    """book.bin next to this file (if present) plus the endgame tables."""
+    opening = PolyglotBook(DEFAULT_BOOK) if os.path.exists(DEFAULT_BOOK) else None
+    return Books(opening, EndgameTable())
+
+def build_endgames(directory: str = ENDGAME_DIR):
+    os.makedirs(directory, exist_ok=True)
+    for name, pt in ENDGAMES.items():
+        table = build_table(pt)
+        with open(os.path.join(directory, name.lower() + ".bin"), "wb") as f:
+            f.write(zlib.compress(bytes(table), 9))
+        print(f"{name}: longest mate {max(table) - 1} plies")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "build":
+        build_endgames()
+    elif len(sys.argv) > 2 and sys.argv[1] == "probe":
+        board = chess.Board(" ".join(sys.argv[2:]))
+        books = default_books()
+        move = books.probe(board)
+        print(board.san(move) if move else "no book move")
+    else:
+        print("usage: python chess_book.py build | probe FEN")
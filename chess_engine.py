@@ -0,0 +1,1113 @@
+# Chess engine for the Kayden Chess GUI — no tkinter, safe to import headless
+# Needs: python-chess  (pip install python-chess)
+
+import chess
+import chess.polyglot
+import multiprocessing as mp
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+# ------------- evaluation -------------
+VAL = {
+    chess.PAWN: 100, chess.KNIGHT: 320, chess.BISHOP: 330,
+    chess.ROOK: 500, chess.QUEEN: 900, chess.KING: 0
+}
+def material_eval(board: chess.Board) -> int:
+    """Positive favors side to move’s perspective if we use negamax."""
+    score = 0
+    for piece_type, val in VAL.items():
+        score += len(board.pieces(piece_type, chess.WHITE)) * val
+        score -= len(board.pieces(piece_type, chess.BLACK)) * val
+    return score
+
+# Piece-square bonuses (centipawns) from White's side, rank 8 on top as you'd
+# read a diagram; Black uses the same tables mirrored.
+PST = {
+    chess.PAWN: [
+          0,   0,   0,   0,   0,   0,   0,   0,
+         50,  50,  50,  50,  50,  50,  50,  50,
+         10,  10,  20,  30,  30,  20,  10,  10,
+          5,   5,  10,  25,  25,  10,   5,   5,
+          0,   0,   0,  20,  20,   0,   0,   0,
+          5,  -5, -10,   0,   0, -10,  -5,   5,
+          5,  10,  10, -20, -20,  10,  10,   5,
+          0,   0,   0,   0,   0,   0,   0,   0],
+    chess.KNIGHT: [
+        -50, -40, -30, -30, -30, -30, -40, -50,
+        -40, -20,   0,   0,   0,   0, -20, -40,
+        -30,   0,  10,  15,  15,  10,   0, -30,
+        -30,   5,  15,  20,  20,  15,   5, -30,
+        -30,   0,  15,  20,  20,  15,   0, -30,
+        -30,   5,  10,  15,  15,  10,   5, -30,
+        -40, -20,   0,   5,   5,   0, -20, -40,
+        -50, -40, -30, -30, -30, -30, -40, -50],
+    chess.BISHOP: [
+        -20, -10, -10, -10, -10, -10, -10, -20,
+        -10,   0,   0,   0,   0,   0,   0, -10,
+        -10,   0,   5,  10,  10,   5,   0, -10,
+        -10,   5,   5,  10,  10,   5,   5, -10,
+        -10,   0,  10,  10,  10,  10,   0, -10,
+        -10,  10,  10,  10,  10,  10,  10, -10,
+        -10,   5,   0,   0,   0,   0,   5, -10,
+        -20, -10, -10, -10, -10, -10, -10, -20],
+    chess.ROOK: [
+          0,   0,   0,   0,   0,   0,   0,   0,
+          5,  10,  10,  10,  10,  10,  10,   5,
+         -5,   0,   0,   0,   0,   0,   0,  -5,
+         -5,   0,   0,   0,   0,   0,   0,  -5,
+         -5,   0,   0,   0,   0,   0,   0,  -5,
+         -5,   0,   0,   0,   0,   0,   0,  -5,
+         -5,   0,   0,   0,   0,   0,   0,  -5,
+          0,   0,   0,   5,   5,   0,   0,   0],
+    chess.QUEEN: [
+        -20, -10, -10,  -5,  -5, -10, -10, -20,
+        -10,   0,   0,   0,   0,   0,   0, -10,
+        -10,   0,   5,   5,   5,   5,   0, -10,
+         -5,   0,   5,   5,   5,   5,   0,  -5,
+          0,   0,   5,   5,   5,   5,   0,  -5,
+        -10,   5,   5,   5,   5,   5,   0, -10,
+        -10,   0,   5,   0,   0,   0,   0, -10,
+        -20, -10, -10,  -5,  -5, -10, -10, -20],
+    chess.KING: [
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -20, -30, -30, -40, -40, -30, -30, -20,
+        -10, -20, -20, -20, -20, -20, -20, -10,
+         20,  20,   0,   0,   0,   0,  20,  20,
+         20,  30,  10,   0,   0,  10,  30,  20],
+}
+MOBILITY = 3   # centipawns per attacked (non-own) square
+
+def build_piece_square(values: dict | None = None) -> dict:
+    """(piece_type, color) -> 64 signed values of material + PST, White-positive."""
+    values = values or VAL
+    table = {}
+    for pt, pst in PST.items():
+        table[(pt, chess.WHITE)] = [values[pt] + pst[sq ^ 56] for sq in chess.SQUARES]
+        table[(pt, chess.BLACK)] = [-(values[pt] + pst[sq]) for sq in chess.SQUARES]
+    return table
+
+PIECE_SQ = build_piece_square()
+
+def mobility(board: chess.Board) -> int:
+    """Pseudo-legal piece mobility, White minus Black: squares attacked by
+    knights and sliders that aren't occupied by their own side. Pure bitboard
+    lookups — no move generation, no pin or check detection."""
+    occ = board.occupied
+    score = 0
+    for color, sign in ((chess.WHITE, 1), (chess.BLACK, -1)):
+        own = board.occupied_co[color]
+        free = ~own
+        n = 0
+        for sq in chess.scan_forward(board.knights & own):
+            n += chess.popcount(chess.BB_KNIGHT_ATTACKS[sq] & free)
+        for sq in chess.scan_forward((board.bishops | board.queens) & own):
+            n += chess.popcount(chess.BB_DIAG_ATTACKS[sq][chess.BB_DIAG_MASKS[sq] & occ] & free)
+        for sq in chess.scan_forward((board.rooks | board.queens) & own):
+            n += chess.popcount((chess.BB_RANK_ATTACKS[sq][chess.BB_RANK_MASKS[sq] & occ] |
+                                 chess.BB_FILE_ATTACKS[sq][chess.BB_FILE_MASKS[sq] & occ]) & free)
+        score += sign * n
+    return score
+
+class Evaluator:
+    """Material + piece-square score kept up to date across push/pop.
+
+    The search calls `push`/`pop` here instead of on the board; each push
+    adds the score delta of the move (moved piece, capture, promotion,
+    castling rook) and each pop restores the previous score, so a leaf only
+    pays for the mobility term.
+
+    `piece_sq` (from build_piece_square) and `mobility_weight` override the
+    default weights, e.g. to play differently tuned engines against each other.
+    """
+    def __init__(self, board: chess.Board, piece_sq: dict | None = None,
+                 mobility_weight: int = MOBILITY):
+        self.board = board
+        self.piece_sq = piece_sq or PIECE_SQ
+        self.mobility_weight = mobility_weight
+        self.score = sum(self.piece_sq[(p.piece_type, p.color)][sq] for sq, p in board.piece_map().items())
+        self.stack = []
+
+    def delta(self, move: chess.Move) -> int:
+        if not move:
+            return 0          # null move
+        b = self.board
+        color = b.turn
+        pt = b.piece_type_at(move.from_square)
+        to = move.to_square
+        table = self.piece_sq
+        d = table[(move.promotion or pt, color)][to] - table[(pt, color)][move.from_square]
+        if pt == chess.KING and b.is_castling(move):
+            rank = move.from_square & 56
+            if b.is_kingside_castling(move):
+                rook_from, rook_to = rank + 7, rank + 5
+            else:
+                rook_from, rook_to = rank, rank + 3
+            rooks = table[(chess.ROOK, color)]
+            d += rooks[rook_to] - rooks[rook_from]
+        else:
+            victim = b.piece_type_at(to)
+            if victim:
+                d -= table[(victim, not color)][to]
+            elif pt == chess.PAWN and to == b.ep_square:
+                cap = to - 8 if color == chess.WHITE else to + 8
+                d -= table[(chess.PAWN, not color)][cap]
+        return d
+
+    def push(self, move: chess.Move):
+        self.stack.append(self.score)
+        self.score += self.delta(move)
+        self.board.push(move)
+
+    def pop(self) -> chess.Move:
+        self.score = self.stack.pop()
+        return self.board.pop()
+
+    def evaluate(self) -> int:
+        """Score from the side to move's point of view."""
+        score = self.score + self.mobility_weight * mobility(self.board)
+        return score if self.board.turn == chess.WHITE else -score
+
+class LegacyEval:
+    """The original leaf evaluation (full material count + legal move count),
+    kept behind the same interface so the benchmark can compare the two."""
+    def __init__(self, board: chess.Board):
+        self.board = board
+        self.push = board.push
+        self.pop = board.pop
+
+    def evaluate(self) -> int:
+        base = material_eval(self.board)
+        # Small bonus for legal moves (mobility)
+        base += 3 * self.board.legal_moves.count()
+        return base if self.board.turn == chess.WHITE else -base
+
+# ------------- transposition table -------------
+TT_EXACT, TT_LOWER, TT_UPPER = 0, 1, 2
+TT_ENTRY_BYTES = 128   # rough cost of one slot (tuple + ints + Move) in CPython
+TT_SIZE_MB = 32
+
+class TranspositionTable:
+    """Fixed-size hash table of search results keyed on the Zobrist hash.
+
+    Each slot holds (key, depth, score, flag, move, age). A slot is replaced
+    when it is empty, holds the same position, was written by an older search,
+    or the new result is at least as deep (depth-preferred with aging).
+    """
+    def __init__(self, size_mb: int = TT_SIZE_MB):
+        self.resize(size_mb)
+
+    def resize(self, size_mb: int):
+        n = max(1, size_mb * 2**20 // TT_ENTRY_BYTES)
+        n = 1 << (n.bit_length() - 1)         # power of two -> mask instead of modulo
+        self.size_mb = size_mb
+        self.mask = n - 1
+        self.slots = [None] * n
+        self.age = 0
+
+    def clear(self):
+        self.slots = [None] * len(self.slots)
+        self.age = 0
+
+    def new_search(self):
+        # entries from earlier moves stay usable but become cheap to overwrite
+        self.age += 1
+
+    def probe(self, key: int):
+        e = self.slots[key & self.mask]
+        if e is not None and e[0] == key:
+            return e
+        return None
+
+    def store(self, key: int, depth: int, score: int, flag: int, move: chess.Move | None):
+        i = key & self.mask
+        e = self.slots[i]
+        if e is not None:
+            same = e[0] == key
+            if not same and e[5] == self.age and depth < e[1]:
+                return
+            if same and move is None:
+                move = e[4]      # keep the old best move for ordering
+        self.slots[i] = (key, depth, score, flag, move, self.age)
+
+    def hashfull(self) -> int:
+        """Per-mille of the first 1000 slots written by the current search."""
+        sample = self.slots[:1000]
+        return sum(1 for e in sample if e is not None and e[5] == self.age) * 1000 // len(sample)
+
+# ------------- move ordering -------------
+MAX_PLY = 128
+
+class MoveOrderer:
+    """Staged, scored move ordering for alpha-beta.
+
+    Moves come out in stages — hash move, promotions, captures by MVV-LVA
+    (most valuable victim, least valuable attacker), the two killer moves
+    of this ply, then quiet moves by history score — and each stage is only
+    generated when the previous one is exhausted, so a cutoff on the hash
+    move or a capture never pays for generating or sorting the quiet moves.
+    """
+    def __init__(self):
+        self.killers = [[None, None] for _ in range(MAX_PLY)]
+        self.history = [[0] * 4096 for _ in (chess.BLACK, chess.WHITE)]
+
+    def new_search(self):
+        self.killers = [[None, None] for _ in range(MAX_PLY)]
+        for table in self.history:           # keep the trend, forget the magnitude
+            for i, h in enumerate(table):
+                if h: table[i] = h >> 1
+
+    def moves(self, board: chess.Board, ply: int, tt_move: chess.Move | None = None):
+        if tt_move is not None and board.is_legal(tt_move):
+            yield tt_move
+        else:
+            tt_move = None
+
+        # captures (en passant and capture-promotions included) and quiet promotions
+        tactical = []
+        for m in board.generate_legal_captures():
+            if m == tt_move: continue
+            victim = board.piece_type_at(m.to_square) or chess.PAWN   # en passant
+            if m.promotion:
+                tactical.append((1000 + 10 * m.promotion + victim, m))
+            else:
+                tactical.append((10 * victim - board.piece_type_at(m.from_square), m))
+        own_pawns = board.pawns & board.occupied_co[board.turn]
+        for m in board.generate_legal_moves(own_pawns, chess.BB_BACKRANKS & ~board.occupied):
+            if m != tt_move:
+                tactical.append((1000 + 10 * m.promotion, m))
+        tactical.sort(key=lambda sm: sm[0], reverse=True)
+        for _, m in tactical:
+            yield m
+
+        killers = self.killers[ply] if ply < MAX_PLY else (None, None)
+        done = [tt_move]
+        for k in killers:
+            if (k is not None and k not in done and not k.promotion
+                    and not board.is_capture(k) and board.is_legal(k)):
+                done.append(k)
+                yield k
+
+        # quiet moves: nothing lands on an enemy piece; drop en passant and promotions
+        ep = board.ep_square
+        not_enemy = chess.BB_ALL & ~board.occupied_co[not board.turn]
+        quiet = [m for m in board.generate_legal_moves(chess.BB_ALL, not_enemy)
+                 if not m.promotion and m not in done
+                 and not (m.to_square == ep and board.piece_type_at(m.from_square) == chess.PAWN)]
+        hist = self.history[board.turn]
+        quiet.sort(key=lambda m: hist[m.from_square << 6 | m.to_square], reverse=True)
+        yield from quiet
+
+    def captures(self, board: chess.Board) -> list:
+        """Captures by MVV-LVA plus quiet queen promotions, for quiescence."""
+        scored = []
+        for m in board.generate_legal_captures():
+            victim = board.piece_type_at(m.to_square) or chess.PAWN   # en passant
+            scored.append((10 * victim - board.piece_type_at(m.from_square) + (1000 if m.promotion else 0), m))
+        own_pawns = board.pawns & board.occupied_co[board.turn]
+        for m in board.generate_legal_moves(own_pawns, chess.BB_BACKRANKS & ~board.occupied):
+            if m.promotion == chess.QUEEN:
+                scored.append((1000, m))
+        scored.sort(key=lambda sm: sm[0], reverse=True)
+        return [m for _, m in scored]
+
+    def cutoff(self, board: chess.Board, move: chess.Move, ply: int, depth: int):
+        """Record a beta cutoff by `move` (called with the move unmade)."""
+        if move.promotion or board.is_capture(move):
+            return
+        if ply < MAX_PLY:
+            k = self.killers[ply]
+            if k[0] != move:
+                k[1], k[0] = k[0], move
+        self.history[board.turn][move.from_square << 6 | move.to_square] += depth * depth
+
+def order_moves(board: chess.Board, first: chess.Move | None = None):
+    # Hash move first, then captures, then others — simple move ordering
+    caps, others = [], []
+    for m in board.legal_moves:
+        if m == first: continue
+        caps.append(m) if board.is_capture(m) else others.append(m)
+    if first is not None and board.is_legal(first):
+        return [first] + caps + others
+    return caps + others
+
+class SimpleOrderer:
+    """The original captures-then-the-rest ordering (plus hash move), for comparison.
+
+    Only the main search uses it: quiescence keeps MoveOrderer's MVV-LVA
+    captures, so a comparison measures the staged ordering, not a
+    quiescence search that explodes on badly ordered captures.
+    """
+    def new_search(self):
+        pass
+
+    def moves(self, board: chess.Board, ply: int, tt_move: chess.Move | None = None):
+        return iter(order_moves(board, tt_move))
+
+    captures = MoveOrderer.captures
+
+    def cutoff(self, board, move, ply, depth):
+        pass
+
+# ------------- search -------------
+INF = 10**9
+MATE = 100000
+MATE_BOUND = MATE - 1000   # |score| above this is "mate in n"
+MAX_DEPTH = 64
+DELTA_MARGIN = 200         # quiescence: slack on top of the captured piece's value
+CHECK_EVERY = 256      # nodes between clock / stop checks
+NULL_R = 2             # null-move depth reduction (3 from depth 7 up)
+NULL_MIN_DEPTH = 3
+LMR_MOVES = 3          # moves searched at full depth before reducing
+LMR_DEPTH = 3
+ASP_WINDOW = 50        # aspiration half-width at the root, centipawns
+
+def score_to_tt(score: int, ply: int) -> int:
+    # mate scores are stored relative to the node, not the root
+    if score > MATE_BOUND: return score + ply
+    if score < -MATE_BOUND: return score - ply
+    return score
+
+def score_from_tt(score: int, ply: int) -> int:
+    if score > MATE_BOUND: return score - ply
+    if score < -MATE_BOUND: return score + ply
+    return score
+
+def insufficient_material(board: chess.Board) -> bool:
+    # bare kings, or a lone knight or bishop: nobody can mate
+    return not (board.pawns | board.rooks | board.queens) and chess.popcount(board.occupied) <= 3
+
+class SearchAborted(Exception):
+    pass
+
+class AlphaBeta:
+    """What Search and chess_bitboard.BitboardSearch share: the counters, the
+    clock, the pruning rules, the root search, the aspiration loop and
+    iterative deepening. A core supplies negamax/quiesce on its own position
+    type and the root hooks `make` (False if the move is illegal), `unmake`
+    and `key` (Zobrist key for the table).
+
+    The selective parts can be switched off one by one to measure them:
+    `null_move` (skip a turn; if that still beats beta, prune), `lmr`
+    (late quiet moves get one or two plies less, re-searched if they
+    turn out good), `pvs` (moves after the first get a null window and
+    are only re-searched with the full one if they beat alpha) and
+    `aspiration` (the root searches a narrow window around the previous
+    iteration's score, widening on a fail).
+    """
+    def __init__(self, tt: TranspositionTable | None, quiescence: bool, null_move: bool,
+                 lmr: bool, pvs: bool, aspiration: bool):
+        self.tt = tt
+        self.quiescence = quiescence
+        self.null_move, self.lmr, self.pvs, self.aspiration = null_move, lmr, pvs, aspiration
+        self.deadline = None
+        self.stop = threading.Event()   # set from another thread to cancel
+        self.root_moves, self.root_scores = [], {}
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Zero the counters that search_stats() reports."""
+        self.nodes = 0           # all nodes, quiescence included
+        self.qnodes = 0
+        self.tt_probes = self.tt_hits = self.tt_cutoffs = 0
+        self.cutoffs = self.first_cutoffs = 0   # beta cutoffs, and those on the first move
+        self.depth_log = []      # (depth, nodes so far, seconds so far) per finished iteration
+
+    def check_time(self):
+        if self.stop.is_set():
+            raise SearchAborted
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise SearchAborted
+
+    # ---------- pruning rules ----------
+    def null_reduction(self, depth: int, alpha: int, beta: int, null_ok: bool, in_check: bool) -> int:
+        """R for a null-move try here, 0 if the rules rule it out. The core
+        still checks that the side to move has pieces (pawn endings are full
+        of zugzwang) and that the static eval reaches beta."""
+        if (self.null_move and null_ok and not in_check and depth >= NULL_MIN_DEPTH
+                and beta - alpha == 1 and abs(beta) < MATE_BOUND):
+            return NULL_R + (depth >= 7)
+        return 0
+
+    def reduction(self, i: int, depth: int, in_check: bool) -> int:
+        """Late-move reduction for the i-th move; the core cancels it for
+        captures, promotions and checking moves."""
+        if self.lmr and i >= LMR_MOVES and depth >= LMR_DEPTH and not in_check:
+            return 1 if i < 2 * LMR_MOVES else 2
+        return 0
+
+    # ---------- root ----------
+    def search_root(self, pos, depth: int, root_moves: list, multipv: int = 1,
+                    lo: int = -INF, hi: int = INF) -> tuple:
+        """One fixed-depth pass over `root_moves`; re-sorts them best-first.
+
+        The best `multipv` moves get exact scores: each move is searched with
+        alpha at the multipv-th best score so far, so only moves that could
+        enter the top list are resolved exactly. With a (lo, hi) window the
+        result is only exact strictly inside it; a move reaching `hi` ends
+        the pass.
+        """
+        scores = {}
+        top = []          # best exact scores so far, descending, at most multipv
+        for move in root_moves:
+            alpha = max(lo, top[-1] if len(top) >= multipv else -INF)
+            self.make(pos, move)
+            try:
+                if self.pvs and top and alpha > -INF:
+                    score = -self.negamax(pos, depth-1, -alpha-1, -alpha, 1)
+                    if alpha < score < hi:
+                        score = -self.negamax(pos, depth-1, -hi, -alpha, 1)
+                else:
+                    score = -self.negamax(pos, depth-1, -hi, -alpha, 1)
+            finally:
+                self.unmake(pos)
+            scores[move] = score
+            if score > alpha:
+                top.append(score)
+                top.sort(reverse=True)
+                del top[multipv:]
+            if score >= hi:
+                break
+        # fail-low scores are only upper bounds, but good enough to order by
+        root_moves.sort(key=lambda m: scores.get(m, -INF), reverse=True)
+        self.root_scores = scores
+        best = root_moves[0] if root_moves else None
+        best_score = scores[best] if best is not None else -INF
+        if self.tt is not None and best is not None:
+            flag = TT_UPPER if best_score <= lo else TT_LOWER if best_score >= hi else TT_EXACT
+            self.tt.store(self.key(pos), depth, best_score, flag, best)
+        return best_score, best
+
+    def aspirate(self, pos, depth: int, root_moves: list, guess: int) -> tuple:
+        """search_root in a window around `guess`, widened until the score is inside."""
+        delta = ASP_WINDOW
+        lo, hi = guess - delta, guess + delta
+        while True:
+            score, move = self.search_root(pos, depth, root_moves, 1, lo, hi)
+            if score <= lo:
+                lo = -INF if delta > 4 * ASP_WINDOW else score - delta
+            elif score >= hi:
+                hi = INF if delta > 4 * ASP_WINDOW else score + delta
+            else:
+                return score, move
+            delta *= 2
+
+    def deepen(self, pos, root_moves: list, start: float, max_depth: int | None = None,
+               movetime: float | None = None, multipv: int = 1):
+        """Iterative deepening over the legal `root_moves`: yield (depth,
+        score, move) for each completed iteration, stopping on the clock or
+        when the search is aborted."""
+        max_depth = max_depth or MAX_DEPTH
+        self.root_moves, self.root_scores = root_moves, {}
+        if not root_moves:
+            return
+        score = None
+        for depth in range(1, max_depth + 1):
+            try:
+                if (self.aspiration and multipv == 1 and depth > 1
+                        and abs(score) < MATE_BOUND):
+                    score, move = self.aspirate(pos, depth, root_moves, score)
+                else:
+                    score, move = self.search_root(pos, depth, root_moves, multipv)
+            except SearchAborted:
+                return
+            self.depth_log.append((depth, self.nodes, time.perf_counter() - start))
+            yield depth, score, move
+            if movetime is not None:
+                elapsed = time.perf_counter() - start
+                # the next iteration costs several times this one; don't start
+                # what can't finish
+                if elapsed >= movetime / 2:
+                    return
+                # depth 1 always completes so there is a move to play
+                self.deadline = start + movetime
+
+    def best_move(self, board: chess.Board, max_depth: int | None = None,
+                  movetime: float | None = None) -> chess.Move | None:
+        best = None
+        for _, _, move in self.iterate(board, max_depth, movetime):
+            best = move
+        return best
+
+class Search(AlphaBeta):
+    """Alpha-beta search on chess.Board: transposition table, node count and clock.
+
+    `iterate` runs iterative deepening (depth 1, 2, 3, ...) and yields after
+    every completed iteration; `best_move` returns the move of the last one
+    that finished inside the time budget. Earlier iterations leave their
+    best moves in the table, so later ones search the principal variation
+    first, and the root moves are re-sorted by their previous scores.
+    The selectivity switches are described on AlphaBeta.
+    """
+    def __init__(self, tt: TranspositionTable | None = None, evaluator=Evaluator,
+                 orderer=MoveOrderer, quiescence: bool = True, null_move: bool = True,
+                 lmr: bool = True, pvs: bool = True, aspiration: bool = True):
+        super().__init__(tt, quiescence, null_move, lmr, pvs, aspiration)
+        self.evaluator = evaluator
+        self.orderer = orderer()
+        self.ev = None
+
+    def make(self, board: chess.Board, move: chess.Move) -> bool:
+        self.ev.push(move)
+        return True
+
+    def unmake(self, board: chess.Board):
+        self.ev.pop()
+
+    def key(self, board: chess.Board) -> int:
+        return chess.polyglot.zobrist_hash(board)
+
+    def attach(self, board: chess.Board):
+        """Bind a fresh evaluator to `board`; all pushes/pops must then go
+        through it. Rebuilt on every call: between searches the caller may
+        have pushed moves on the same board behind its back."""
+        self.ev = self.evaluator(board)
+
+    def negamax(self, board: chess.Board, depth: int, alpha: int, beta: int, ply: int = 0,
+                null_ok: bool = True) -> int:
+        if insufficient_material(board):
+            self.nodes += 1
+            return 0
+        if depth <= 0:
+            if self.quiescence:
+                return self.quiesce(board, alpha, beta, ply)
+            self.nodes += 1
+            return self.ev.evaluate()
+        self.nodes += 1
+        if self.nodes % CHECK_EVERY == 0:
+            self.check_time()
+        tt = self.tt
+        alpha0 = alpha
+        key = None
+        tt_move = None
+        if tt is not None:
+            key = chess.polyglot.zobrist_hash(board)
+            hit = tt.probe(key)
+            self.tt_probes += 1
+            if hit is not None:
+                self.tt_hits += 1
+                _, d, s, flag, tt_move, _ = hit
+                s = score_from_tt(s, ply)
+                if d >= depth:
+                    if (flag == TT_EXACT or flag == TT_LOWER and s >= beta
+                            or flag == TT_UPPER and s <= alpha):
+                        self.tt_cutoffs += 1
+                        return s
+
+        ev = self.ev
+        if board.halfmove_clock >= 100 and any(board.generate_legal_moves()):
+            return 0
+
+        in_check = board.is_check()
+        r = self.null_reduction(depth, alpha, beta, null_ok, in_check)
+        if (r and board.occupied_co[board.turn] & ~(board.pawns | board.kings)
+                and ev.evaluate() >= beta):
+            ev.push(chess.Move.null())
+            try:
+                score = -self.negamax(board, depth-1-r, -beta, -beta+1, ply+1, False)
+            finally:
+                ev.pop()
+            if score >= beta:
+                return beta
+
+        best = -INF
+        best_move = None
+        for i, move in enumerate(self.orderer.moves(board, ply, tt_move)):
+            r = self.reduction(i, depth, in_check)
+            if r and (move.promotion or board.is_capture(move)):
+                r = 0
+            ev.push(move)
+            try:
+                if i == 0:
+                    score = -self.negamax(board, depth-1, -beta, -alpha, ply+1)
+                else:
+                    if r and board.is_check():
+                        r = 0
+                    bound = alpha + 1 if self.pvs else beta
+                    score = -self.negamax(board, depth-1-r, -bound, -alpha, ply+1)
+                    if r and score > alpha:
+                        score = -self.negamax(board, depth-1, -bound, -alpha, ply+1)
+                    if self.pvs and alpha < score < beta:
+                        score = -self.negamax(board, depth-1, -beta, -alpha, ply+1)
+            finally:
+                ev.pop()
+            if score > best:
+                best, best_move = score, move
+            if best > alpha:
+                alpha = best
+            if alpha >= beta:
+                self.cutoffs += 1
+                self.first_cutoffs += i == 0
+                self.orderer.cutoff(board, move, ply, depth)
+                break
+
+        if best_move is None:
+            return -MATE + ply if in_check else 0
+
+        if tt is not None:
+            flag = TT_UPPER if best <= alpha0 else TT_LOWER if best >= beta else TT_EXACT
+            tt.store(key, depth, score_to_tt(best, ply), flag, best_move)
+        return best
+
+    def quiesce(self, board: chess.Board, alpha: int, beta: int, ply: int) -> int:
+        """Captures-only search below the horizon so leaves are scored quiet.
+
+        The side to move may "stand pat" on the static eval instead of
+        capturing. Delta pruning skips captures that can't lift the score
+        back to alpha even with DELTA_MARGIN to spare. In check every
+        evasion is searched and standing pat is not allowed.
+        """
+        self.nodes += 1
+        self.qnodes += 1
+        if self.nodes % CHECK_EVERY == 0:
+            self.check_time()
+        ev = self.ev
+        if ply >= MAX_PLY - 1:
+            return ev.evaluate()
+        if insufficient_material(board):
+            return 0
+
+        in_check = board.is_check()
+        if in_check:
+            best = -INF
+            moves = self.orderer.moves(board, ply)
+        else:
+            best = ev.evaluate()
+            if best >= beta:
+                return best
+            if best + VAL[chess.QUEEN] + DELTA_MARGIN < alpha:
+                return best      # not even winning a queen would help
+            alpha = max(alpha, best)
+            moves = self.orderer.captures(board)
+
+        for move in moves:
+            if not in_check and not move.promotion:
+                victim = board.piece_type_at(move.to_square) or chess.PAWN
+                if best + VAL[victim] + DELTA_MARGIN <= alpha:
+                    continue
+            ev.push(move)
+            try:
+                score = -self.quiesce(board, -beta, -alpha, ply+1)
+            finally:
+                ev.pop()
+            if score > best:
+                best = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        if best == -INF:     # in check with no evasions
+            return -MATE + ply
+        return best
+
+    def clearly_best(self, board: chess.Board, moves: set, margin: int, depth: int) -> bool:
+        """True if every root move outside `moves` scores at least `margin`
+        below the best one, checked with null-window searches `depth` plies
+        deep. Call between iterations, like `lines`."""
+        bound = self.root_scores[self.root_moves[0]] - margin
+        for m in self.root_moves:
+            if m in moves:
+                continue
+            self.ev.push(m)
+            try:
+                score = -self.negamax(board, depth-1, -bound-1, -bound, 1)
+            finally:
+                self.ev.pop()
+            if score > bound:
+                return False
+        return True
+
+    def pv(self, board: chess.Board, move: chess.Move, length: int) -> list:
+        """`move` followed by the hash moves stored below it, up to `length` plies."""
+        b = board.copy(stack=False)
+        line = [move]
+        b.push(move)
+        seen = {chess.polyglot.zobrist_hash(b)}
+        while self.tt is not None and len(line) < length:
+            hit = self.tt.probe(chess.polyglot.zobrist_hash(b))
+            if hit is None or hit[4] is None or not b.is_legal(hit[4]):
+                break
+            b.push(hit[4])
+            key = chess.polyglot.zobrist_hash(b)
+            if key in seen:
+                break
+            seen.add(key)
+            line.append(hit[4])
+        return line
+
+    def lines(self, board: chess.Board, n: int, depth: int) -> list:
+        """Top `n` (score, pv) of the last completed iteration, best first.
+        Call between iterations (e.g. while `iterate` is suspended)."""
+        return [(self.root_scores[m], self.pv(board, m, depth)) for m in self.root_moves[:n]]
+
+    def iterate(self, board: chess.Board, max_depth: int | None = None,
+                movetime: float | None = None, multipv: int = 1):
+        """Yield (depth, score, move) for each completed iteration."""
+        start = time.perf_counter()
+        self.reset_stats()
+        self.deadline = None
+        self.attach(board)
+        self.orderer.new_search()
+        if self.tt is not None:
+            self.tt.new_search()
+            hit = self.tt.probe(chess.polyglot.zobrist_hash(board))
+        else:
+            hit = None
+        root_moves = list(self.orderer.moves(board, 0, hit[4] if hit else None))
+        yield from self.deepen(board, root_moves, start, max_depth, movetime, multipv)
+
+
+def search_stats(search) -> dict:
+    """What the last search did: node counts, TT and cutoff rates, and per
+    iteration its nodes, time and effective branching factor (nodes over
+    the previous iteration's). Counters a search doesn't keep (ParallelSearch
+    only has nodes and depths) come out as 0."""
+    get = lambda name: getattr(search, name, 0)
+    depths, prev_n, prev_t = [], 0, 0.0
+    for depth, nodes, t in getattr(search, "depth_log", []):
+        n = nodes - prev_n
+        ebf = round(n / depths[-1]["nodes"], 2) if depths and depths[-1]["nodes"] else None
+        depths.append({"depth": depth, "nodes": n, "time": round(t - prev_t, 4), "ebf": ebf})
+        prev_n, prev_t = nodes, t
+    return {
+        "nodes": search.nodes,
+        "qnodes": get("qnodes"),
+        "tt_probes": get("tt_probes"),
+        "tt_hits": get("tt_hits"),
+        "tt_cutoffs": get("tt_cutoffs"),
+        "cutoffs": get("cutoffs"),
+        "first_cutoffs": get("first_cutoffs"),
+        "tt_hit_rate": round(get("tt_hits") / get("tt_probes"), 3) if get("tt_probes") else 0,
+        "first_cutoff_rate": round(get("first_cutoffs") / get("cutoffs"), 3) if get("cutoffs") else 0,
+        "ebf": next((d["ebf"] for d in reversed(depths) if d["ebf"]), None),
+        "depths": depths,
+    }
+
+def format_stats(stats: dict) -> str:
+    """search_stats() as one log line."""
+    depth = stats["depths"][-1]["depth"] if stats["depths"] else 0
+    q = stats["qnodes"] / stats["nodes"] if stats["nodes"] else 0
+    ttd = " ".join(f"{d['time']:.2f}" for d in stats["depths"])
+    return (f"depth {depth}  {stats['nodes']:,} nodes ({q:.0%} q)  tt hit {stats['tt_hit_rate']:.0%}"
+            f" / {stats['tt_cutoffs']:,} cuts  1st-move cutoffs {stats['first_cutoff_rate']:.0%}"
+            f"  ebf {stats['ebf'] or '-'}  s/depth [{ttd}]")
+
+def score_str(score: int) -> str:
+    """Centipawns as +1.25, or mate distance as #3 / #-2 (in moves)."""
+    if score > MATE_BOUND:
+        return f"#{(MATE - score + 1) // 2}"
+    if score < -MATE_BOUND:
+        return f"#-{(MATE + score) // 2}"
+    return f"{score / 100:+.2f}"
+
+def negamax(board: chess.Board, depth: int, alpha: int, beta: int,
+            tt: TranspositionTable | None = None) -> int:
+    search = Search(tt)
+    search.attach(board)
+    return search.negamax(board, depth, alpha, beta)
+
+# ------------- parallel (root-split) search -------------
+_worker = {}    # per-process state of a WorkerPool process
+
+def _init_worker(alpha, abort, tt_mb):
+    search = Search(TranspositionTable(tt_mb))
+    search.stop = abort          # anything with is_set() will do
+    _worker["search"] = search
+    _worker["alpha"] = alpha
+
+def _search_root_move(fen: str, uci: str, depth: int) -> tuple:
+    """Worker task: score one root move against the pool's shared alpha.
+
+    Returns (uci, score, nodes); score is None if the search was aborted.
+    A score above the alpha read at the start is exact and is published
+    back, so moves started later in this iteration search a narrower window.
+    """
+    search, shared = _worker["search"], _worker["alpha"]
+    board = chess.Board(fen)
+    search.attach(board)
+    search.nodes = 0
+    alpha = shared.value
+    search.ev.push(chess.Move.from_uci(uci))
+    try:
+        score = -search.negamax(board, depth-1, -INF, -alpha, 1)
+    except SearchAborted:
+        return uci, None, search.nodes
+    finally:
+        search.ev.pop()
+    if score > alpha:
+        with shared.get_lock():
+            if score > shared.value:
+                shared.value = score
+    return uci, score, search.nodes
+
+class WorkerPool:
+    """Long-lived worker processes for ParallelSearch.
+
+    Each process keeps its own transposition table, killers and history
+    between searches. Processes are spawned (not forked) so it is safe to
+    create a pool from a program that already runs Tk or other threads.
+    """
+    def __init__(self, workers: int, tt_mb: int = TT_SIZE_MB):
+        ctx = mp.get_context("spawn")
+        self.workers = workers
+        self.alpha = ctx.Value("l", -INF)
+        self.abort = ctx.Event()
+        self.executor = ProcessPoolExecutor(workers, mp_context=ctx, initializer=_init_worker,
+                                            initargs=(self.alpha, self.abort, tt_mb))
+
+    def close(self):
+        self.abort.set()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class ParallelSearch:
+    """Iterative deepening that splits the root moves across a WorkerPool.
+
+    Same interface as Search (`iterate`, `best_move`, `nodes`, `stop`,
+    `deadline`); `stop` and `deadline` abort the workers mid-iteration.
+
+    At each depth the first (principal) move is searched alone to set a
+    good alpha, then the remaining moves are handed out one task per move.
+    """
+    def __init__(self, pool: WorkerPool):
+        self.pool = pool
+        self.nodes = 0
+        self.depth_log = []
+        self.deadline = None
+        self.stop = threading.Event()
+
+    def out_of_time(self) -> bool:
+        return self.stop.is_set() or (self.deadline is not None and time.perf_counter() >= self.deadline)
+
+    def run_tasks(self, fen: str, moves: list, depth: int, scores: dict) -> bool:
+        """Search `moves` at `depth` into `scores`; False if aborted."""
+        pool = self.pool
+        pending = {pool.executor.submit(_search_root_move, fen, m.uci(), depth) for m in moves}
+        aborted = False
+        while pending:
+            done, pending = wait(pending, timeout=0.02, return_when=FIRST_COMPLETED)
+            for f in done:
+                if f.cancelled(): continue
+                uci, score, nodes = f.result()
+                self.nodes += nodes
+                if score is None:
+                    aborted = True
+                else:
+                    scores[uci] = score
+            if not aborted and self.out_of_time():
+                aborted = True
+                pool.abort.set()
+                for f in pending: f.cancel()
+        return not aborted
+
+    def iterate(self, board: chess.Board, max_depth: int | None = None,
+                movetime: float | None = None):
+        """Yield (depth, score, move) for each completed iteration."""
+        max_depth = max_depth or MAX_DEPTH
+        start = time.perf_counter()
+        self.deadline = None
+        self.nodes = 0
+        self.depth_log = []
+        fen = board.fen()
+        root_moves = list(MoveOrderer().moves(board, 0))
+        if not root_moves:
+            return
+        for depth in range(1, max_depth + 1):
+            if self.out_of_time():
+                return
+            self.pool.alpha.value = -INF
+            self.pool.abort.clear()
+            scores = {}
+            if not (self.run_tasks(fen, root_moves[:1], depth, scores) and
+                    self.run_tasks(fen, root_moves[1:], depth, scores)):
+                return
+            root_moves.sort(key=lambda m: scores[m.uci()], reverse=True)
+            best = root_moves[0]
+            self.depth_log.append((depth, self.nodes, time.perf_counter() - start))
+            yield depth, scores[best.uci()], best
+            if movetime is not None:
+                if time.perf_counter() - start >= movetime / 2:
+                    return
+                self.deadline = start + movetime
+
+    def best_move(self, board: chess.Board, max_depth: int | None = None,
+                  movetime: float | None = None) -> chess.Move | None:
+        best = None
+        for _, _, move in self.iterate(board, max_depth, movetime):
+            best = move
+        return best
+
+# ------------- time management -------------
+MOVE_OVERHEAD = 0.05      # seconds kept back per move for the GUI / thread start-up
+INSTABILITY = 1.0         # budget = soft * (1 + INSTABILITY * recent best-move changes)
+RECAPTURE_MARGIN = 150    # a recapture this much better than every other move is played at once
+RECAPTURE_DEPTH = 4
+
+def allot_time(time_left: float, inc: float, fullmove: int, moves_to_go: int | None = None) -> tuple:
+    """(soft, hard) seconds for one move on a clock.
+
+    Expects about 40 more moves early on, fewer as the game goes (never
+    under 15), and spends most of the increment. The hard limit (abort
+    mid-iteration) is 4x soft but never more than half the clock.
+    """
+    usable = max(0.0, time_left - MOVE_OVERHEAD)
+    moves = moves_to_go or max(15, 40 - fullmove // 2)
+    soft = usable / moves + 0.75 * inc
+    hard = min(4 * soft, usable / 2 if moves > 1 else usable * 0.9)
+    return max(0.01, min(soft, hard)), max(0.01, hard)
+
+class TimeManager:
+    """Decides after each iteration whether a clocked search should go on.
+
+    Starts from allot_time's soft budget and stretches it (up to the hard
+    limit) while the best move keeps changing between iterations; each
+    change counts 1 and the count halves every iteration. Stops at once
+    with a single legal move, and once recapturing on the square the
+    opponent just took on is clearly better than everything else.
+    """
+    def __init__(self, board: chess.Board, time_left: float, inc: float,
+                 moves_to_go: int | None = None):
+        self.soft, self.hard = allot_time(time_left, inc, board.fullmove_number, moves_to_go)
+        self.limit = self.soft
+        self.single = board.legal_moves.count() == 1
+        self.recapture_sq = None
+        if board.move_stack:
+            b = board.copy()
+            last = b.pop()
+            if b.is_capture(last):
+                self.recapture_sq = last.to_square
+        self.checked_recapture = False
+        self.prev = None
+        self.changes = 0.0
+
+    def stop_after(self, search, board: chess.Board, depth: int, move: chess.Move,
+                   elapsed: float) -> bool:
+        if self.single:
+            return True
+        self.changes = self.changes / 2 + (self.prev is not None and move != self.prev)
+        self.prev = move
+        self.limit = min(self.hard, self.soft * (1 + INSTABILITY * self.changes))
+        if (move.to_square == self.recapture_sq and depth >= RECAPTURE_DEPTH
+                and hasattr(search, "clearly_best") and not self.checked_recapture):
+            self.checked_recapture = True     # asked once, a few plies short of the iteration
+            recaptures = {m for m in board.legal_moves if m.to_square == self.recapture_sq}
+            try:
+                if search.clearly_best(board, recaptures, RECAPTURE_MARGIN, depth - 2):
+                    return True
+            except SearchAborted:
+                return True
+        return elapsed >= self.limit / 2      # the next iteration wouldn't finish
+
+class SearchThread(threading.Thread):
+    """Runs one iterative-deepening search on a private copy of the board.
+
+    The Tk thread only reads `nodes`, `progress` and `done`, so no locking
+    is needed; `cancel()` makes the search unwind within CHECK_EVERY nodes.
+    A thread (not a process) keeps the game's transposition table shared
+    with the GUI, at the cost of the search holding the GIL while it runs.
+    A book hit (see chess_book) is reported as a depth-0 result with no search.
+    With `clock` = (seconds left, increment) a TimeManager sets the budget
+    instead of `movetime`.
+    """
+    def __init__(self, board: chess.Board, depth: int | None, movetime: float | None,
+                 tt: TranspositionTable | None = None, pool: WorkerPool | None = None,
+                 book=None, multipv: int = 0, clock: tuple | None = None):
+        super().__init__(daemon=True)
+        self.board = board.copy()
+        self.depth, self.movetime = depth, movetime
+        self.timer = TimeManager(self.board, *clock) if clock else None
+        self.book = book
+        self.multipv = multipv   # > 0: also publish the top lines as `lines`
+        self.lines = []
+        self.search = ParallelSearch(pool) if pool is not None else Search(tt)
+        self.progress = None     # (depth, score, move) of the last finished iteration
+        self.hit_movetime = None # set by ponderhit()
+        self.started = time.time()
+        self.t0 = time.perf_counter()
+        self.done = False
+
+    @property
+    def nodes(self) -> int:
+        return self.search.nodes
+
+    @property
+    def result(self) -> chess.Move | None:
+        return self.progress[2] if self.progress else None
+
+    def cancel(self):
+        self.search.stop.set()
+
+    def ponderhit(self, movetime: float | None):
+        """Turn a ponder search into the real one after the predicted move was
+        played: keep going, but only until `movetime` after pondering began.
+        Like Search.iterate, the deadline only applies once an iteration has
+        finished, so there is always a move even if that time has passed."""
+        self.hit_movetime = movetime
+        if movetime is not None and self.progress is not None:
+            self.search.deadline = self.t0 + movetime
+
+    def finished_iteration(self, it) -> bool:
+        """Record `it`; True if a ponder hit's time is already used up."""
+        self.progress = it
+        if self.hit_movetime is None:
+            return False
+        self.search.deadline = self.t0 + self.hit_movetime
+        return time.perf_counter() >= self.search.deadline
+
+    def run(self):
+        try:
+            move = self.book.probe(self.board) if self.book is not None else None
+            if move is not None:
+                self.progress = (0, 0, move)
+                return
+            if self.multipv:
+                for it in self.search.iterate(self.board, self.depth, self.movetime, self.multipv):
+                    self.lines = self.search.lines(self.board, self.multipv, it[0])
+                    self.progress = it
+                return
+            if self.timer is not None:
+                for it in self.search.iterate(self.board, self.depth, self.timer.hard):
+                    self.progress = it
+                    if self.timer.stop_after(self.search, self.board, it[0], it[2], time.perf_counter() - self.t0):
+                        break
+                return
+            for it in self.search.iterate(self.board, self.depth, self.movetime):
+                if self.finished_iteration(it):
+                    break
+        finally:
+            self.done = True
+
+def ai_best_move(board: chess.Board, depth: int | None = None,
+                 tt: TranspositionTable | None = None,
+                 movetime: float | None = None,
+                 pool: WorkerPool | None = None, book=None,
+                 core: str = "board") -> chess.Move | None:
+    """Best move by iterative deepening up to `depth` plies and/or `movetime` seconds.
+
+    With a WorkerPool the root moves are searched in parallel (`tt` is then
+    unused; each worker has its own table). A `book` (anything with
+    `probe(board)`, see chess_book) is asked first and skips the search on a hit.
+    core="bitboard" searches on chess_bitboard.Position instead of chess.Board
+    (faster; give it its own `tt`, the stored moves are ints there).
+    """
+    if book is not None:
+        move = book.probe(board)
+        if move is not None:
+            return move
+    if pool is not None:
+        return ParallelSearch(pool).best_move(board, depth, movetime)
+    if tt is None:
+        tt = TranspositionTable(TT_SIZE_MB)
+    if core == "bitboard":
+        from chess_bitboard import BitboardSearch
+        return BitboardSearch(tt).best_move(board, depth, movetime)
+    return Search(tt).best_move(board, depth, movetime)
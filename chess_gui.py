@@ -4,9 +4,15 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import chess
+import chess.polyglot
 import math
+import multiprocessing as mp
 import time
 
+from chess_book import default_books
+from chess_engine import (TT_SIZE_MB, SearchThread, TranspositionTable, WorkerPool, allot_time,
+                          format_stats, score_str, search_stats)
+
 # ------------ look & feel -------------
 SQ = 78
 BORDER = 18
@@ -27,57 +33,26 @@ GLYPHS = {
     chess.KING:   ("♔", "♚"),
 }
 
-# ------------- AI (minimax, alpha-beta) -------------
-VAL = {
-    chess.PAWN: 100, chess.KNIGHT: 320, chess.BISHOP: 330,
-    chess.ROOK: 500, chess.QUEEN: 900, chess.KING: 0
+# ------------- AI options -------------
+# Difficulty label -> (max depth, seconds per move); None means no limit
+DIFFICULTY = {
+    "Depth 1": (1, None),
+    "Depth 2": (2, None),
+    "Depth 3": (3, None),
+    "0.5 s / move": (None, 0.5),
+    "1 s / move": (None, 1.0),
+    "3 s / move": (None, 3.0),
+}
+ANALYSIS_LINES = 3     # principal variations shown in analysis mode
+# Clock label -> (minutes, increment seconds); with a clock the engine
+# manages its own time and the difficulty only caps the depth
+TIME_CONTROLS = {
+    "No clock": None,
+    "1 + 0": (1, 0),
+    "3 + 2": (3, 2),
+    "5 + 3": (5, 3),
+    "15 + 10": (15, 10),
 }
-
-def material_eval(board: chess.Board) -> int:
-    """Positive favors side to move’s perspective if we use negamax."""
-    score = 0
-    for piece_type, val in VAL.items():
-        score += len(board.pieces(piece_type, chess.WHITE)) * val
-        score -= len(board.pieces(piece_type, chess.BLACK)) * val
-    return score
-
-def negamax(board: chess.Board, depth: int, alpha: int, beta: int) -> int:
-    if depth == 0 or board.is_game_over():
-        base = material_eval(board)
-        # Small bonus for legal moves (mobility)
-        base += 3 * board.legal_moves.count()
-        return base if board.turn == chess.WHITE else -base
-
-    best = -10**9
-    for move in order_moves(board):
-        board.push(move)
-        score = -negamax(board, depth-1, -beta, -alpha)
-        board.pop()
-        if score > best:
-            best = score
-        if best > alpha:
-            alpha = best
-        if alpha >= beta:
-            break
-    return best
-
-def order_moves(board: chess.Board):
-    # Captures first, then others — simple move ordering
-    caps, others = [], []
-    for m in board.legal_moves:
-        caps.append(m) if board.is_capture(m) else others.append(m)
-    return caps + others
-
-def ai_best_move(board: chess.Board, depth: int) -> chess.Move | None:
-    best_score = -10**9
-    best = None
-    for move in order_moves(board):
-        board.push(move)
-        score = -negamax(board, depth-1, -10**9, 10**9)
-        board.pop()
-        if score > best_score:
-            best_score, best = score, move
-    return best
 
 # ---------------- GUI -----------------
 class App:
@@ -88,10 +63,23 @@ class App:
         self.board = chess.Board()
         self.selected = None
         self.hl_items = []
-        self.piece_items = {}
+        self.piece_items = {}     # square -> (canvas item, glyph)
         self.last_move = None
         self.captured_white = []
         self.captured_black = []
+        self.san_history = []     # SAN of every move in board.move_stack
+        self.capture_log = []     # per move: captured piece type or None
+        self.tt = TranspositionTable(TT_SIZE_MB)   # reused across moves of one game
+        self.ai_job = None                         # SearchThread while the AI thinks
+        self.analysis_job = None                   # multi-PV SearchThread in analysis mode
+        self.ponder_job = None                     # search on the predicted reply, human's turn
+        self.ponder_move = None
+        self.pool = None                           # WorkerPool when using more than one core
+        self.book = default_books()                # opening book + KQK/KRK tables
+        self.clock = None                          # [black, white] seconds left, or None
+        self.increment = 0
+        self.clock_start = time.perf_counter()     # when the side to move's clock started
+        self.flagged = None                        # colour that ran out of time
 
         # Left: board canvas
         self.canvas = tk.Canvas(root, width=SQ*8 + BORDER*2, height=SQ*8 + BORDER*2)
@@ -102,9 +90,14 @@ class App:
         side = ttk.Frame(root, padding=6)
         side.grid(row=0, column=1, sticky="ns")
 
+        header = ttk.Frame(side)
+        header.grid(row=0, column=0, sticky="ew", pady=(0,6))
+        header.columnconfigure(1, weight=1)
         self.turn_var = tk.StringVar()
-        self.turn_label = ttk.Label(side, textvariable=self.turn_var, font=("SF Pro", 13, "bold"))
-        self.turn_label.grid(row=0, column=0, sticky="w", pady=(0,6))
+        self.turn_label = ttk.Label(header, textvariable=self.turn_var, font=("SF Pro", 13, "bold"))
+        self.turn_label.grid(row=0, column=0, sticky="w")
+        self.clock_var = tk.StringVar()
+        ttk.Label(header, textvariable=self.clock_var, font=("SF Pro", 13)).grid(row=0, column=1, sticky="e")
 
         ttk.Label(side, text="Moves").grid(row=1, column=0, sticky="w")
         self.moves = tk.Text(side, width=24, height=20, state="disabled")
@@ -125,6 +118,13 @@ class App:
         btns.grid(row=4, column=0, sticky="ew", pady=(8,0))
         ttk.Button(btns, text="New Game", command=self.new_game).grid(row=0, column=0, padx=2)
         ttk.Button(btns, text="Undo", command=self.undo).grid(row=0, column=1, padx=2)
+        self.analyze_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(btns, text="Analyze", variable=self.analyze_var,
+                        command=self.restart_analysis).grid(row=0, column=2, padx=2)
+        self.ponder_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(btns, text="Ponder", variable=self.ponder_var).grid(row=0, column=3, padx=2)
+        self.stats_var = tk.BooleanVar(value=False)     # log search counters to stdout
+        ttk.Checkbutton(btns, text="Stats", variable=self.stats_var).grid(row=0, column=4, padx=2)
 
         # AI options
         ai_frame = ttk.Frame(side)
@@ -133,16 +133,37 @@ class App:
         self.side_var = tk.StringVar(value="White")
         side_pick = ttk.Combobox(ai_frame, textvariable=self.side_var, values=["White","Black","Human vs Human"], state="readonly", width=16)
         side_pick.grid(row=0, column=1, padx=4)
+        side_pick.bind("<<ComboboxSelected>>", lambda e: self.side_changed())
 
         ttk.Label(ai_frame, text="Difficulty:").grid(row=1, column=0, sticky="w", pady=(6,0))
-        self.depth_var = tk.IntVar(value=2)
-        depth_box = ttk.Combobox(ai_frame, textvariable=self.depth_var, values=[1,2,3], state="readonly", width=16)
+        self.depth_var = tk.StringVar(value="Depth 2")
+        depth_box = ttk.Combobox(ai_frame, textvariable=self.depth_var, values=list(DIFFICULTY), state="readonly", width=16)
         depth_box.grid(row=1, column=1, padx=4, pady=(6,0))
 
+        ttk.Label(ai_frame, text="Cores:").grid(row=2, column=0, sticky="w", pady=(6,0))
+        self.cores_var = tk.IntVar(value=1)
+        cores = sorted({1, 2, 4, 8, mp.cpu_count()})
+        cores_box = ttk.Combobox(ai_frame, textvariable=self.cores_var, values=cores, state="readonly", width=16)
+        cores_box.grid(row=2, column=1, padx=4, pady=(6,0))
+
+        ttk.Label(ai_frame, text="Clock:").grid(row=3, column=0, sticky="w", pady=(6,0))
+        self.tc_var = tk.StringVar(value="No clock")
+        tc_box = ttk.Combobox(ai_frame, textvariable=self.tc_var, values=list(TIME_CONTROLS), state="readonly", width=16)
+        tc_box.grid(row=3, column=1, padx=4, pady=(6,0))
+        tc_box.bind("<<ComboboxSelected>>", lambda e: self.reset_clock())
+
+        self.ai_info_var = tk.StringVar()
+        ttk.Label(ai_frame, textvariable=self.ai_info_var, width=34).grid(row=4, column=0, columnspan=2, sticky="w", pady=(6,0))
+
+        # Analysis lines
+        self.analysis = tk.Text(side, width=34, height=ANALYSIS_LINES + 1, state="disabled", wrap="none")
+        self.analysis.grid(row=6, column=0, sticky="ew", pady=(8,0))
+
         self.root.bind("u", lambda e: self.undo())
 
         self.draw_board()
         self.refresh()
+        self.tick()
 
     # ---------- drawing ----------
     def draw_board(self):
@@ -164,7 +185,6 @@ class App:
             self.canvas.create_text(BORDER-10, y, text=str(r+1), tags="coord")
 
     def refresh(self):
-        self.canvas.delete("piece")
         self.clear_highlights()
 
         # last move highlight
@@ -178,15 +198,8 @@ class App:
             if king_sq is not None:
                 self.outline_square(king_sq, HILITE_CHECK, 4)
 
-        # draw pieces
-        self.piece_items.clear()
-        for sq in chess.SQUARES:
-            p = self.board.piece_at(sq)
-            if not p: continue
-            glyph = GLYPHS[p.piece_type][0 if p.color == chess.WHITE else 1]
-            x, y = self.center_of(sq)
-            item = self.canvas.create_text(x, y, text=glyph, font=PIECE_FONT, tags="piece")
-            self.piece_items[sq] = item
+        self.sync_pieces()
+        self.canvas.tag_raise("piece")
 
         self.turn_var.set(("White to move" if self.board.turn else "Black to move"))
 
@@ -194,27 +207,48 @@ class App:
         self.cap_by_w.config(text=" ".join(GLYPHS[p][1] for p in self.captured_white))
         self.cap_by_b.config(text=" ".join(GLYPHS[p][0] for p in self.captured_black))
 
-        # move list
-        self.moves.config(state="normal")
-        self.moves.delete("1.0", "end")
-        san = []
-        tmp = chess.Board()
-        for m in self.board.move_stack:
-            san.append(tmp.san(m))
-            tmp.push(m)
-        # format 1. e4 e5 2. Nf3 ...
-        lines = []
-        for i in range(0, len(san), 2):
-            n = i//2 + 1
-            if i+1 < len(san):
-                lines.append(f"{n}. {san[i]} {san[i+1]}")
-            else:
-                lines.append(f"{n}. {san[i]}")
-        self.moves.insert("1.0", "\n".join(lines))
-        self.moves.config(state="disabled")
-
         self.root.update_idletasks()
         self.maybe_let_ai_play()
+        self.restart_analysis()
+        self.maybe_ponder()
+
+    def sync_pieces(self):
+        """Touch only the canvas items of squares whose piece changed."""
+        c = self.canvas
+        for sq in chess.SQUARES:
+            p = self.board.piece_at(sq)
+            glyph = GLYPHS[p.piece_type][0 if p.color == chess.WHITE else 1] if p else None
+            old = self.piece_items.get(sq)
+            if old is not None and old[1] == glyph:
+                continue
+            if glyph is None:
+                c.delete(old[0])
+                del self.piece_items[sq]
+            elif old is not None:
+                c.itemconfig(old[0], text=glyph)
+                self.piece_items[sq] = (old[0], glyph)
+            else:
+                x, y = self.center_of(sq)
+                item = c.create_text(x, y, text=glyph, font=PIECE_FONT, tags="piece")
+                self.piece_items[sq] = (item, glyph)
+
+    def update_move_list(self):
+        """Rewrite the last line of the move list after one push or pop.
+
+        Lines before it can't have changed, so this is constant work per move
+        however long the game gets. Format: 1. e4 e5 / 2. Nf3 ...
+        """
+        san = self.san_history
+        want = (len(san) + 1) // 2        # number of lines there should be
+        t = self.moves
+        t.config(state="normal")
+        t.delete(f"{max(want, 1)}.0", "end")
+        if want:
+            i = 2 * (want - 1)
+            line = f"{want}. {san[i]}" + (f" {san[i+1]}" if i+1 < len(san) else "")
+            t.insert(f"{want}.0", line + "\n")
+        t.config(state="disabled")
+        t.see("end")
 
     # ---------- helpers ----------
     def center_of(self, sq):
@@ -236,7 +270,7 @@ class App:
         sq = self.xy_to_square(e.x, e.y)
         if sq is None: return
 
-        if self.is_ai_turn():  # ignore clicks while AI is thinking
+        if self.is_ai_turn() or self.flagged is not None:  # ignore clicks while AI is thinking
             return
 
         if self.selected is None:
@@ -278,54 +312,55 @@ class App:
     # ---------- gameplay ----------
     def make_move(self, move: chess.Move):
         # record capture for trays
+        victim = None
         if self.board.is_capture(move):
             victim_sq = move.to_square if self.board.piece_at(move.to_square) else chess.square(chess.square_file(move.to_square),
                                                                                                 chess.square_rank(move.from_square))
-            victim = self.board.piece_at(victim_sq)
+            victim = self.board.piece_type_at(victim_sq)
             if victim:
                 if self.board.turn == chess.WHITE:
-                    self.captured_white.append(victim.piece_type)
+                    self.captured_white.append(victim)
                 else:
-                    self.captured_black.append(victim.piece_type)
+                    self.captured_black.append(victim)
+        self.capture_log.append(victim)
+        self.san_history.append(self.board.san(move))
+        self.press_clock()
 
         self.board.push(move)
         self.last_move = move
+        self.update_move_list()
         self.refresh()
         self.check_end()
 
     def undo(self):
+        self.cancel_ai()
         if not self.board.move_stack: return
-        # undo capture trays if needed
-        last = self.board.pop()
-        # If that move was a capture, pop from trays
-        if last.drop is None and (last.capture or last.promotion or True):
-            # Easiest reliable way: recompute trays from scratch
-            self.recompute_captures()
+        self.board.pop()
+        self.san_history.pop()
+        # If that move was a capture, pop from the capturing side's tray
+        if self.capture_log.pop():
+            (self.captured_white if self.board.turn == chess.WHITE else self.captured_black).pop()
+        self.update_move_list()
         self.last_move = self.board.move_stack[-1] if self.board.move_stack else None
         self.selected = None
+        self.clock_start = time.perf_counter()     # clocks keep their times; nobody pays for the undo
         self.refresh()
 
-    def recompute_captures(self):
-        self.captured_white, self.captured_black = [], []
-        tmp = chess.Board()
-        for m in self.board.move_stack:
-            if tmp.is_capture(m):
-                victim_sq = m.to_square if tmp.piece_at(m.to_square) else chess.square(
-                    chess.square_file(m.to_square), chess.square_rank(m.from_square))
-                victim = tmp.piece_at(victim_sq)
-                if victim:
-                    (self.captured_white if tmp.turn == chess.WHITE else self.captured_black).append(victim.piece_type)
-            tmp.push(m)
-
     def new_game(self):
+        self.cancel_ai()
         self.board.reset()
         self.selected = None
         self.last_move = None
         self.captured_white, self.captured_black = [], []
+        self.san_history, self.capture_log = [], []
+        self.tt.clear()
+        self.reset_clock()
+        self.update_move_list()
         self.refresh()
 
     def check_end(self):
         if self.board.is_game_over():
+            self.cancel_ponder()
             out = self.board.outcome()
             if out is None:
                 msg = "Game over."
@@ -337,6 +372,48 @@ class App:
                 msg = "Draw."
             messagebox.showinfo("Result", msg)
 
+    # ---------- clocks ----------
+    def reset_clock(self):
+        tc = TIME_CONTROLS[self.tc_var.get()]
+        self.clock = [60.0 * tc[0], 60.0 * tc[0]] if tc else None
+        self.increment = tc[1] if tc else 0
+        self.clock_start = time.perf_counter()
+        self.flagged = None
+        self.show_clock()
+
+    def time_left(self, color: chess.Color) -> float:
+        left = self.clock[color]
+        if color == self.board.turn and not self.board.is_game_over():
+            left -= time.perf_counter() - self.clock_start
+        return left
+
+    def press_clock(self):
+        """Called just before the side to move's move is pushed."""
+        if self.clock is None or self.flagged is not None:
+            return
+        now = time.perf_counter()
+        self.clock[self.board.turn] -= now - self.clock_start
+        self.clock[self.board.turn] += self.increment
+        self.clock_start = now
+
+    def show_clock(self):
+        if self.clock is None:
+            self.clock_var.set("")
+            return
+        def fmt(t):
+            t = max(0.0, t)
+            return f"{int(t // 60)}:{t % 60:04.1f}" if t < 20 else f"{int(t // 60)}:{int(t % 60):02d}"
+        self.clock_var.set(f"♔ {fmt(self.time_left(chess.WHITE))}   ♚ {fmt(self.time_left(chess.BLACK))}")
+
+    def tick(self):
+        self.show_clock()
+        if self.clock is not None and self.flagged is None and not self.board.is_game_over():
+            if self.time_left(self.board.turn) <= 0:
+                self.flagged = self.board.turn
+                self.cancel_ai()
+                messagebox.showinfo("Result", ("White" if self.flagged else "Black") + " lost on time.")
+        self.root.after(100, self.tick)
+
     # ---------- AI integration ----------
     def is_ai_turn(self):
         mode = self.side_var.get()
@@ -345,22 +422,157 @@ class App:
         return self.board.turn == ai_color
 
     def maybe_let_ai_play(self):
+        if (self.side_var.get() == "Human vs Human" or self.board.is_game_over()
+                or self.flagged is not None):
+            self.cancel_ponder()     # nobody will play the reply it is searching
+            return
         if not self.is_ai_turn(): return
-        if self.board.is_game_over(): return
+        if self.ai_job is not None: return
+
+        depth, movetime = DIFFICULTY[self.depth_var.get()]
+        clock = None
+        if self.clock is not None:
+            clock = (self.time_left(self.board.turn), self.increment)
+            movetime = None
+        job, guess = self.ponder_job, self.ponder_move
+        self.ponder_job = self.ponder_move = None
+        if job is not None:
+            if self.board.move_stack and self.board.peek() == guess:
+                # ponder hit: the search is already on this position
+                if clock is not None:
+                    # this move's soft budget from now on, on top of the pondering
+                    soft, _ = allot_time(clock[0], clock[1], self.board.fullmove_number)
+                    movetime = time.perf_counter() - job.t0 + soft
+                job.ponderhit(movetime)
+                self.ai_job = job
+                self.poll_ai(job)
+                return
+            job.cancel()     # its transposition-table entries stay in self.tt
+
+        self.ai_job = SearchThread(self.board, depth, movetime, self.tt, self.worker_pool(), self.book,
+                                   clock=clock)
+        self.ai_job.start()
+        self.root.after(50, self.poll_ai, self.ai_job)
+
+    def worker_pool(self):
+        workers = int(self.cores_var.get())
+        if workers <= 1:
+            return None
+        if self.pool is None or self.pool.workers != workers:
+            if self.pool is not None:
+                self.pool.close()
+            self.pool = WorkerPool(workers)
+        return self.pool
+
+    def cancel_ai(self):
+        if self.ai_job is not None:
+            self.ai_job.cancel()
+            self.ai_job = None
+            self.ai_info_var.set("")
+        self.cancel_ponder()
+
+    def cancel_ponder(self):
+        if self.ponder_job is not None:
+            self.ponder_job.cancel()
+            self.ponder_job = self.ponder_move = None
+
+    def side_changed(self):
+        self.cancel_ai()
+        self.refresh()
 
-        self.root.after(50, self.ai_play)
+    def maybe_ponder(self):
+        """On the human's turn, search the position after their likeliest reply.
+
+        The guess is the hash move the AI's own search left for this position.
+        If the human plays it, maybe_let_ai_play adopts the running search;
+        otherwise it is cancelled, keeping what it wrote to the table.
+        """
+        if not self.ponder_var.get() or self.analyze_var.get() or self.flagged is not None: return
+        if self.side_var.get() == "Human vs Human" or self.is_ai_turn(): return
+        if self.ponder_job is not None or self.board.is_game_over(): return
+        hit = self.tt.probe(chess.polyglot.zobrist_hash(self.board))
+        guess = hit[4] if hit else None
+        if guess is None or not self.board.is_legal(guess): return
+
+        depth, movetime = DIFFICULTY[self.depth_var.get()]
+        ponder_board = self.board.copy()
+        ponder_board.push(guess)
+        # fixed-depth levels ponder to their depth; timed levels until the reply
+        self.ponder_job = SearchThread(ponder_board, depth, None, self.tt, book=self.book)
+        self.ponder_move = guess
+        self.ponder_job.start()
+
+    def poll_ai(self, job):
+        if job is not self.ai_job:
+            return   # cancelled by Undo / New Game
+        self.ai_info_var.set(self.describe_progress(job))
+        if not job.done:
+            self.root.after(50, self.poll_ai, job)
+            return
+        # tiny delay to feel “human” (not on the clock)
+        wait = int(1000 * (0.2 - (time.time() - job.started))) if self.clock is None else 0
+        if wait > 0:
+            self.root.after(wait, self.ai_play, job)
+        else:
+            self.ai_play(job)
+
+    def describe_progress(self, job) -> str:
+        if job.progress is None:
+            return f"Thinking… {job.nodes:,} nodes"
+        depth, score, move = job.progress
+        if depth == 0:
+            return f"Book move {self.board.san(move)}"
+        return f"Depth {depth} · {job.nodes:,} nodes · best {self.board.san(move)} ({score_str(score)})"
+
+    # ---------- analysis mode ----------
+    def restart_analysis(self):
+        """(Re)start the background multi-PV search for the current position.
+
+        The new search shares the game's transposition table, so the part of
+        the tree that the previous position already explored is picked up
+        from the table instead of being searched again from cold.
+        """
+        if self.analysis_job is not None:
+            self.analysis_job.cancel()
+            self.analysis_job = None
+        if not self.analyze_var.get() or self.board.is_game_over() or self.is_ai_turn():
+            self.show_analysis("")
+            return
+        self.analysis_job = SearchThread(self.board, None, None, self.tt, multipv=ANALYSIS_LINES)
+        self.analysis_job.start()
+        self.root.after(200, self.poll_analysis, self.analysis_job, None)
 
-    def ai_play(self):
-        depth = int(self.depth_var.get())
-        t0 = time.time()
-        move = ai_best_move(self.board, depth)
+    def poll_analysis(self, job, shown_depth):
+        if job is not self.analysis_job:
+            return
+        if job.progress is not None and job.progress[0] != shown_depth:
+            shown_depth = job.progress[0]
+            sign = 1 if self.board.turn == chess.WHITE else -1    # show White's view
+            rows = [f"Depth {shown_depth} · {job.nodes:,} nodes"]
+            for score, pv in job.lines:
+                rows.append(f"{score_str(sign * score):>6}  {self.board.variation_san(pv)}")
+            self.show_analysis("\n".join(rows))
+        if not job.done:
+            self.root.after(200, self.poll_analysis, job, shown_depth)
+
+    def show_analysis(self, text):
+        self.analysis.config(state="normal")
+        self.analysis.delete("1.0", "end")
+        self.analysis.insert("1.0", text)
+        self.analysis.config(state="disabled")
+
+    def ai_play(self, job):
+        if job is not self.ai_job:
+            return
+        self.ai_job = None
+        move = job.result
         if move is None:
+            # stopped before depth 1 finished (e.g. a ponder hit out of time): search afresh
+            self.maybe_let_ai_play()
             return
+        if self.stats_var.get() and job.progress[0] > 0:
+            print(f"{self.board.san(move)}: {format_stats(search_stats(job.search))}", flush=True)
         self.make_move(move)
-        # tiny delay to feel “human”
-        elapsed = time.time() - t0
-        if elapsed < 0.2:
-            time.sleep(0.2 - elapsed)
 
 # ------------- run -------------
 if __name__ == "__main__":
@@ -0,0 +1,201 @@
+# Headless engine-vs-engine matches for tuning chess_engine settings
+#
+#   python chess_match.py "depth=3" "depth=2" --games 40
+#   python chess_match.py "movetime=0.2" "movetime=0.2,mobility=6,knight=300" --workers 8
+#   python chess_match.py A B --openings openings.epd --pgn match.pgn --results match.jsonl
+#
+# An engine spec is comma-separated key=value pairs:
+#   depth, movetime    search limits (at least one; movetime in seconds)
+#   pawn knight bishop rook queen   material values (default: chess_engine.VAL)
+#   mobility           centipawns per mobility square
+#   tt                 transposition table size in MB
+#   qsearch=0          disable quiescence,  order=simple   old move ordering
+#   eval=rich          add pawn structure and king safety (chess_eval)
+#   nullmove=0 lmr=0 pvs=0 aspiration=0     switch off a selective search feature
+# Each opening is played twice with colours reversed. Games are spread across
+# a process pool; PGN and one JSON line per game are appended as they finish.
+
+import argparse
+import json
+import math
+import multiprocessing as mp
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+
+import chess
+import chess.pgn
+
+from chess_eval import RichEvaluator
+from chess_engine import (TT_SIZE_MB, VAL, Evaluator, MOBILITY, Search, SimpleOrderer,
+                          TranspositionTable, build_piece_square)
+
+PIECE_KEYS = {"pawn": chess.PAWN, "knight": chess.KNIGHT, "bishop": chess.BISHOP,
+              "rook": chess.ROOK, "queen": chess.QUEEN}
+
+# Short, balanced opening lines (SAN from the start position)
+OPENINGS = [
+    "e4 e5 Nf3 Nc6 Bb5",
+    "e4 e5 Nf3 Nc6 Bc4",
+    "e4 c5 Nf3 d6",
+    "e4 c6 d4 d5",
+    "e4 e6 d4 d5",
+    "d4 d5 c4 e6",
+    "d4 d5 c4 c6",
+    "d4 Nf6 c4 g6",
+    "d4 Nf6 c4 e6 Nc3 Bb4",
+    "c4 e5 Nc3 Nf6",
+    "Nf3 d5 g3 Nf6",
+    "e4 d5 exd5 Qxd5",
+]
+MAX_PLIES = 300
+SWITCHES = {"nullmove": "null_move", "lmr": "lmr", "pvs": "pvs", "aspiration": "aspiration"}
+
+def parse_engine(spec: str) -> dict:
+    cfg = {"name": spec}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        key, _, value = part.partition("=")
+        if key not in ("depth", "movetime", "mobility", "tt", "qsearch", "order", "eval", *SWITCHES, *PIECE_KEYS):
+            raise ValueError(f"unknown engine option {key!r} in {spec!r}")
+        cfg[key] = value if key in ("order", "eval") else float(value) if key == "movetime" else int(value)
+    if "depth" not in cfg and "movetime" not in cfg:
+        raise ValueError(f"engine {spec!r} needs depth= or movetime=")
+    return cfg
+
+def make_search(cfg: dict) -> Search:
+    values = dict(VAL)
+    for key, pt in PIECE_KEYS.items():
+        if key in cfg:
+            values[pt] = cfg[key]
+    evaluator = partial(RichEvaluator if cfg.get("eval") == "rich" else Evaluator,
+                        piece_sq=build_piece_square(values),
+                        mobility_weight=cfg.get("mobility", MOBILITY))
+    kwargs = dict(evaluator=evaluator, quiescence=bool(cfg.get("qsearch", 1)))
+    for key, arg in SWITCHES.items():
+        kwargs[arg] = bool(cfg.get(key, 1))
+    if cfg.get("order") == "simple":
+        kwargs["orderer"] = SimpleOrderer
+    return Search(TranspositionTable(cfg.get("tt", TT_SIZE_MB)), **kwargs)
+
+def load_openings(path: str | None) -> list:
+    """Start positions as FENs: from an EPD/FEN file, or the built-in lines."""
+    if path is None:
+        fens = []
+        for line in OPENINGS:
+            board = chess.Board()
+            for san in line.split():
+                board.push_san(san)
+            fens.append(board.fen())
+        return fens
+    with open(path) as f:
+        return [chess.Board(" ".join(line.split()[:4]) + " 0 1").fen()
+                for line in f if line.strip() and not line.startswith("#")]
+
+def play_game(game_id: int, fen: str, white: dict, black: dict) -> dict:
+    """Play one game; returns the result, PGN text and per-side move times."""
+    board = chess.Board(fen)
+    engines = {chess.WHITE: (white, make_search(white)), chess.BLACK: (black, make_search(black))}
+    think = {chess.WHITE: [0.0, 0], chess.BLACK: [0.0, 0]}
+    while not board.is_game_over(claim_draw=True) and len(board.move_stack) < MAX_PLIES:
+        cfg, search = engines[board.turn]
+        t0 = time.perf_counter()
+        move = search.best_move(board, cfg.get("depth"), cfg.get("movetime"))
+        think[board.turn][0] += time.perf_counter() - t0
+        think[board.turn][1] += 1
+        board.push(move)
+
+    result = board.result(claim_draw=True)
+    if result == "*":
+        result = "1/2-1/2"               # adjudicated at MAX_PLIES
+    game = chess.pgn.Game.from_board(board)
+    game.headers.update(Event="chess_match", Round=str(game_id + 1),
+                        White=white["name"], Black=black["name"], Result=result)
+    if fen != chess.STARTING_FEN:
+        game.headers["FEN"] = fen
+        game.headers["SetUp"] = "1"
+    return {"game": game_id, "white": white["name"], "black": black["name"], "result": result,
+            "plies": len(board.move_stack), "pgn": str(game),
+            "time": {"white": think[chess.WHITE], "black": think[chess.BLACK]}}
+
+def elo(wins: int, draws: int, losses: int) -> tuple:
+    """Elo difference and 95% interval from a W/D/L count (engine A's view)."""
+    n = wins + draws + losses
+    if n == 0:
+        return 0.0, -math.inf, math.inf
+    p = (wins + draws / 2) / n
+    var = (wins * (1 - p) ** 2 + draws * (0.5 - p) ** 2 + losses * p ** 2) / n
+    margin = 1.96 * math.sqrt(var / n)
+
+    def to_elo(x):
+        if x <= 0: return -math.inf
+        if x >= 1: return math.inf
+        return -400 * math.log10(1 / x - 1) + 0.0    # no "-0"
+    return to_elo(p), to_elo(p - margin), to_elo(p + margin)
+
+def run_match(a: dict, b: dict, games: int, openings: list, workers: int,
+              pgn_path: str | None, results_path: str | None):
+    jobs = []
+    for i in range(games):
+        fen = openings[(i // 2) % len(openings)]
+        jobs.append((i, fen, a, b) if i % 2 == 0 else (i, fen, b, a))
+
+    wdl = [0, 0, 0]                         # from engine A's side
+    think = {a["name"]: [0.0, 0], b["name"]: [0.0, 0]}
+    pgn_out = open(pgn_path, "a") if pgn_path else None
+    res_out = open(results_path, "a") if results_path else None
+    t0 = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(workers) as pool:
+            futures = [pool.submit(play_game, *job) for job in jobs]
+            for done, f in enumerate(as_completed(futures), 1):
+                g = f.result()
+                a_white = g["white"] == a["name"]
+                score = {"1-0": 1.0, "0-1": 0.0}.get(g["result"], 0.5)
+                score = score if a_white else 1 - score
+                wdl[0 if score == 1 else 1 if score == 0.5 else 2] += 1
+                for side in ("white", "black"):
+                    t, n = g["time"][side]
+                    think[g[side]][0] += t
+                    think[g[side]][1] += n
+                if pgn_out:
+                    pgn_out.write(g["pgn"] + "\n\n")
+                    pgn_out.flush()
+                if res_out:
+                    res_out.write(json.dumps({k: v for k, v in g.items() if k != "pgn"}) + "\n")
+                    res_out.flush()
+                print(f"[{done}/{games}] {g['white']} vs {g['black']}: {g['result']} ({g['plies']} plies)"
+                      f"   A +{wdl[0]} ={wdl[1]} -{wdl[2]}", flush=True)
+    finally:
+        for f in (pgn_out, res_out):
+            if f: f.close()
+    elapsed = time.perf_counter() - t0
+    return wdl, think, elapsed
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Play engine configurations against each other.")
+    ap.add_argument("engine_a")
+    ap.add_argument("engine_b")
+    ap.add_argument("--games", type=int, default=20)
+    ap.add_argument("--openings", help="EPD/FEN file of start positions (default: built-in lines)")
+    ap.add_argument("--workers", type=int, default=mp.cpu_count())
+    ap.add_argument("--pgn", help="append games to this PGN file")
+    ap.add_argument("--results", help="append one JSON line per game to this file")
+    args = ap.parse_args(argv)
+
+    a, b = parse_engine(args.engine_a), parse_engine(args.engine_b)
+    if a["name"] == b["name"]:
+        a["name"], b["name"] = a["name"] + " (A)", b["name"] + " (B)"
+    wdl, think, elapsed = run_match(a, b, args.games, load_openings(args.openings),
+                                    args.workers, args.pgn, args.results)
+
+    e, lo, hi = elo(*wdl)
+    print(f"\n{a['name']} vs {b['name']}: +{wdl[0]} ={wdl[1]} -{wdl[2]}")
+    print(f"Elo difference {e:+.0f}  (95% {lo:+.0f} .. {hi:+.0f})")
+    print(f"{args.games / (elapsed / 60):.1f} games/min")
+    for name, (t, n) in think.items():
+        print(f"  {name}: {1000 * t / max(1, n):.0f} ms/move over {n} moves")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
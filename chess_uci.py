@@ -0,0 +1,219 @@
+# UCI front-end for chess_engine, for GUIs / tournament managers (cutechess, Arena, ...)
+#
+#   python chess_uci.py
+#
+# Supported: uci, isready, ucinewgame, setoption (Hash, Core), position
+# (startpos | fen ... [moves ...]), go (depth, movetime, wtime/btime/winc/binc/
+# movestogo, infinite, ponder), ponderhit, stop, quit. The search runs on a
+# thread so `stop` and `isready` are answered while it thinks. After `go
+# infinite` or `go ponder`, bestmove waits for `stop` (or `ponderhit`, which
+# switches to the normal limits, counted from the hit). Nothing heavy is
+# imported until the first command that needs the engine, so `uci` is
+# answered at once.
+
+import sys
+import threading
+import time
+
+NAME = "Kayden Chess"
+HASH_DEFAULT = 32          # chess_engine.TT_SIZE_MB, without importing it
+HASH_MAX = 4096
+
+class UCI:
+    def __init__(self, out=sys.stdout):
+        self.out = out
+        self.lock = threading.Lock()
+        self.hash_mb = HASH_DEFAULT
+        self.core = "board"
+        self.tt = None
+        self.board = None
+        self.search = None
+        self.thread = None
+        self.hold = threading.Event()   # set once bestmove may be sent
+        self.hit_limit = None           # hard limit in seconds while pondering
+        self.pondering = False
+        self.hit_at = None              # perf_counter() of the ponderhit
+        self.iterated = False           # an iteration of this go has finished
+
+    def send(self, line: str):
+        with self.lock:
+            self.out.write(line + "\n")
+            self.out.flush()
+
+    def engine(self):
+        """Import the engine and set up the table on first use."""
+        if self.tt is None:
+            import chess
+            from chess_engine import TranspositionTable
+            self.tt = TranspositionTable(self.hash_mb)
+            self.board = chess.Board()
+        return self.tt
+
+    # ---------- commands ----------
+    def cmd_uci(self, args):
+        self.send(f"id name {NAME}")
+        self.send("id author Kayden")
+        self.send(f"option name Hash type spin default {HASH_DEFAULT} min 1 max {HASH_MAX}")
+        self.send("option name Core type combo default board var board var bitboard")
+        self.send("option name Ponder type check default false")
+        self.send("uciok")
+
+    def cmd_isready(self, args):
+        self.engine()
+        self.send("readyok")
+
+    def cmd_ucinewgame(self, args):
+        self.cmd_stop(args)
+        self.engine().clear()
+
+    def cmd_setoption(self, args):
+        # setoption name <id> [value <x>]
+        words = " ".join(args)
+        name, _, value = words.partition(" value ")
+        name = name.removeprefix("name ").strip().lower()
+        value = value.strip()
+        if name == "hash":
+            self.hash_mb = max(1, min(HASH_MAX, int(value)))
+            if self.tt is not None:
+                self.cmd_stop([])
+                self.tt.resize(self.hash_mb)
+        elif name == "core" and value in ("board", "bitboard"):
+            if value != self.core and self.tt is not None:
+                self.cmd_stop([])
+                self.tt.clear()       # the cores store different move types
+            self.core = value
+
+    def cmd_position(self, args):
+        import chess
+        self.engine()
+        self.cmd_stop([])
+        if "moves" in args:
+            i = args.index("moves")
+            args, moves = args[:i], args[i + 1:]
+        else:
+            moves = []
+        if args and args[0] == "fen":
+            board = chess.Board(" ".join(args[1:]))
+        else:
+            board = chess.Board()
+        for uci in moves:
+            board.push_uci(uci)
+        self.board = board
+
+    def cmd_go(self, args):
+        self.engine()
+        self.cmd_stop([])
+        opts = {}
+        i = 0
+        while i < len(args):
+            key = args[i]
+            if key in ("infinite", "ponder"):
+                opts[key] = True
+                i += 1
+            else:
+                opts[key] = args[i + 1] if i + 1 < len(args) else None
+                i += 2
+        depth = int(opts["depth"]) if opts.get("depth") else None
+        movetime = int(opts["movetime"]) / 1000 if opts.get("movetime") else None
+        side = "w" if self.board.turn else "b"
+        timer = None
+        if movetime is None and opts.get(side + "time") is not None:
+            from chess_engine import TimeManager
+            timer = TimeManager(self.board, int(opts[side + "time"]) / 1000, int(opts.get(side + "inc") or 0) / 1000,
+                                int(opts["movestogo"]) if opts.get("movestogo") else None)
+            movetime = timer.hard
+        if opts.get("infinite"):
+            depth = movetime = timer = None
+        self.pondering = bool(opts.get("ponder"))
+        if opts.get("infinite") or self.pondering:
+            self.hold.clear()
+        else:
+            self.hold.set()
+        self.hit_limit = movetime
+        self.hit_at = None
+        self.iterated = False
+        if self.pondering:
+            movetime = None                  # no limits until ponderhit
+
+        if self.core == "bitboard":
+            from chess_bitboard import BitboardSearch
+            self.search = BitboardSearch(self.tt)
+        else:
+            from chess_engine import Search
+            self.search = Search(self.tt)
+        self.thread = threading.Thread(target=self.think, daemon=True,
+                                       args=(self.search, self.board.copy(), depth, movetime, timer))
+        self.thread.start()
+
+    def think(self, search, board, depth, movetime, timer=None):
+        from chess_engine import MATE, MATE_BOUND
+        t0 = time.perf_counter()
+        best = None
+        for d, score, move in search.iterate(board, depth, movetime):
+            best = move
+            ms = max(1, int(1000 * (time.perf_counter() - t0)))
+            if abs(score) > MATE_BOUND:
+                moves = (MATE - abs(score) + 1) // 2
+                score_s = f"mate {moves if score > 0 else -moves}"
+            else:
+                score_s = f"cp {score}"
+            pv = search.pv(board, move, d) if hasattr(search, "pv") else [move]
+            hashfull = f" hashfull {search.tt.hashfull()}" if search.tt is not None else ""
+            self.send(f"info depth {d} score {score_s} nodes {search.nodes} nps {search.nodes * 1000 // ms}"
+                      f"{hashfull} time {ms} pv {' '.join(m.uci() for m in pv)}")
+            self.iterated = True
+            if self.apply_hit():
+                break
+            hit_at = self.hit_at
+            if timer is not None:
+                # kept up to date while pondering, but only obeyed after the hit
+                stop = timer.stop_after(search, board, d, move, time.perf_counter() - (hit_at or t0))
+                if stop and not (self.pondering and hit_at is None):
+                    break
+        if best is None:
+            # mated/stalemated, or stopped before depth 1 finished
+            best = next(iter(board.legal_moves), None)
+        self.hold.wait()                     # infinite / ponder: not before stop or ponderhit
+        self.send(f"bestmove {best.uci() if best else '0000'}")
+
+    def apply_hit(self) -> bool:
+        """After a ponderhit, give the search the go command's own hard limit,
+        counted from the hit. Like Search.iterate, only once an iteration has
+        finished, so there is always a move. True if it is already used up."""
+        hit_at = self.hit_at
+        if not self.pondering or hit_at is None or not self.iterated or self.hit_limit is None:
+            return False
+        self.search.deadline = hit_at + self.hit_limit
+        return time.perf_counter() >= self.search.deadline
+
+    def cmd_ponderhit(self, args):
+        if self.thread is None or not self.pondering:
+            return
+        self.hit_at = time.perf_counter()
+        self.apply_hit()
+        self.hold.set()
+
+    def cmd_stop(self, args):
+        if self.thread is not None:
+            self.search.stop.set()
+            self.hold.set()
+            self.thread.join()
+            self.thread = None
+
+    def loop(self, lines=sys.stdin):
+        for line in lines:
+            words = line.split()
+            if not words:
+                continue
+            if words[0] == "quit":
+                break
+            handler = getattr(self, "cmd_" + words[0], None)
+            if handler is not None:
+                try:
+                    handler(words[1:])
+                except (ValueError, IndexError) as e:
+                    self.send(f"info string error: {e}")
+        self.cmd_stop([])
+
+if __name__ == "__main__":
+    UCI().loop()
@@ -3,6 +3,7 @@
 # Auto closes shortly after reaching goal.
 
 import turtle, random, time
+from maze_render import draw_runs_canvas, draw_runs_turtle, wall_runs
 
 # ==== Tunables ====
 ROWS, COLS   = 20, 20
@@ -12,6 +13,8 @@ BASE_STEP    = 2
 BASE_SLEEP   = 0.008
 TURTLE_SPEED = 6
 END_DELAY_MS = 2500
+SOLVER       = "dfs"        # or bfs / astar / bidirectional / dead-end (maze_solve.py)
+DRAW_BACKEND = "canvas"     # "canvas": lines straight on the Tk canvas, "turtle": turtle runs
 
 # ==== Runtime ====
 SPEED_LEVEL   = 5
@@ -102,18 +105,13 @@ def generate_maze(r,c):
     return m
 
 def draw_maze(t, m, r, c):
+    # each wall once, collinear walls merged into one stroke
     t.color(WALL_COLOR); t.width(WALL_THICK)
-    def seg(x1,y1,x2,y2):
-        t.penup(); t.goto(x1,y1); t.pendown(); t.goto(x2,y2); t.penup()
-    for y in range(r):
-        for x in range(c):
-            sx,sy = x*CELL, -y*CELL
-            w = m[(x,y)]
-            if w["N"]: seg(sx,sy, sx+CELL,sy)
-            if w["E"]: seg(sx+CELL,sy, sx+CELL,sy-CELL)
-            if w["S"]: seg(sx+CELL,sy-CELL, sx,sy-CELL)
-            if w["W"]: seg(sx,sy-CELL, sx,sy)
-    t.penup()
+    draw_runs_turtle(t, wall_runs(m, r, c), CELL)
+
+def draw_maze_canvas(screen, m, r, c):
+    draw_runs_canvas(screen.getcanvas(), wall_runs(m, r, c), CELL,
+                     screen.xscale, screen.yscale, WALL_COLOR, WALL_THICK)
 
 def dfs_exploration_steps(maze, start, goal):
     steps = []
@@ -244,9 +242,17 @@ def main():
     T.shape("turtle"); T.color("white"); T.speed(TURTLE_SPEED); T.penup()
 
     maze = generate_maze(ROWS, COLS)
-    draw_maze(T, maze, ROWS, COLS); turtle.update()
-
-    ACTIONS = dfs_exploration_steps(maze, (0,0), (COLS-1, ROWS-1))
+    if DRAW_BACKEND == "canvas":
+        draw_maze_canvas(screen, maze, ROWS, COLS)
+    else:
+        draw_maze(T, maze, ROWS, COLS)
+    turtle.update()
+
+    if SOLVER == "dfs":
+        ACTIONS = dfs_exploration_steps(maze, (0,0), (COLS-1, ROWS-1))
+    else:
+        from maze_solve import from_dict, solve
+        _, ACTIONS = solve(SOLVER, from_dict(maze, ROWS, COLS), (0,0), (COLS-1, ROWS-1))
 
     # Start at entrance and step into start center
     sx, sy = cell_center(0,0)
@@ -0,0 +1,115 @@
+# Headless benchmark for maze_grid
+#
+#   python maze_bench.py generate                          every generator at the default sizes
+#   python maze_bench.py generate --algo eller --algo kruskal --sizes 500 1000 2000
+#   python maze_bench.py generate --sizes 4000 --no-memory --no-check   throughput only
+#   python maze_bench.py generate --json gen.json          also write the report
+#   python maze_bench.py solve --sizes 300 1000            every solver on the same mazes
+#   python maze_bench.py solve --gen kruskal --solver bfs --solver astar
+#
+# Sizes are square (N x N). Time is measured with tracemalloc off; peak memory
+# comes from a second, traced run with the same seed. "extra" is the peak minus
+# the finished grid (rows*cols/2 bytes), i.e. what the algorithm itself needs.
+# Solvers go from the entrance (0,0) to the exit corner; "visited" is how many
+# cells each one touched, and every path is checked against BFS.
+
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from maze_grid import GENERATORS, generate, is_perfect
+from maze_solve import SOLVERS
+
+SIZES = [100, 300, 1000]
+
+# ------------- generate -------------
+def run_generate(algos: list, sizes: list, seed: int = 1, check: bool = True, memory: bool = True) -> dict:
+    rows = []
+    for size in sizes:
+        for algo in algos:
+            t0 = time.perf_counter()
+            m = generate(algo, size, size, random.Random(seed))
+            elapsed = time.perf_counter() - t0
+            ok = is_perfect(m) if check else None
+            grid = m.nbytes()
+            del m
+
+            peak = None
+            if memory:
+                tracemalloc.start()
+                generate(algo, size, size, random.Random(seed))
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+
+            cells = size * size
+            rows.append({"algo": algo, "size": size, "cells": cells, "time": elapsed,
+                         "cells_per_sec": cells / elapsed, "peak_mb": peak and peak / 1e6,
+                         "extra_mb": peak and (peak - grid) / 1e6, "ok": ok})
+    return {"seed": seed, "rows": rows}
+
+def print_generate(report: dict):
+    print(f"{'algo':<12} {'size':>6} {'time s':>8} {'Mcells/s':>9} {'peak MB':>8} {'extra MB':>9}  perfect")
+    for r in report["rows"]:
+        ok = "-" if r["ok"] is None else "ok" if r["ok"] else "FAIL"
+        mem = f"{r['peak_mb']:>8.2f} {r['extra_mb']:>9.2f}" if r["peak_mb"] is not None else f"{'-':>8} {'-':>9}"
+        print(f"{r['algo']:<12} {r['size']:>6} {r['time']:>8.3f} {r['cells_per_sec'] / 1e6:>9.3f} {mem}  {ok}")
+
+# ------------- solve -------------
+def run_solve(solvers: list, sizes: list, gen: str = "backtracker", seed: int = 1) -> dict:
+    rows = []
+    for size in sizes:
+        m = generate(gen, size, size, random.Random(seed))
+        start, goal = (0, 0), (size - 1, size - 1)
+        shortest = None
+        for name in solvers:
+            t0 = time.perf_counter()
+            path, visited = SOLVERS[name](m, start, goal)
+            elapsed = time.perf_counter() - t0
+            if shortest is None:
+                shortest = len(SOLVERS["bfs"](m, start, goal)[0])
+            rows.append({"solver": name, "size": size, "time": elapsed, "visited": len(visited),
+                         "visited_pct": 100 * len(visited) / (size * size), "path": len(path),
+                         "ok": len(path) == shortest})
+    return {"gen": gen, "seed": seed, "rows": rows}
+
+def print_solve(report: dict):
+    print(f"mazes: {report['gen']}, seed {report['seed']}")
+    print(f"{'solver':<14} {'size':>6} {'time s':>8} {'visited':>9} {'%':>6} {'path':>7}  shortest")
+    for r in report["rows"]:
+        print(f"{r['solver']:<14} {r['size']:>6} {r['time']:>8.3f} {r['visited']:>9} "
+              f"{r['visited_pct']:>5.1f}% {r['path']:>7}  {'ok' if r['ok'] else 'FAIL'}")
+
+# ------------- CLI -------------
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark the maze generators and solvers without turtle.")
+    ap.add_argument("mode", choices=["generate", "solve"])
+    ap.add_argument("--algo", action="append", choices=list(GENERATORS),
+                    help="generate: generator to run; repeat to compare (default: all)")
+    ap.add_argument("--solver", action="append", choices=list(SOLVERS),
+                    help="solve: solver to run; repeat to compare (default: all)")
+    ap.add_argument("--gen", choices=list(GENERATORS), default="backtracker", help="solve: maze generator")
+    ap.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="square grid sizes")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--no-check", action="store_true", help="skip the spanning-tree check")
+    ap.add_argument("--no-memory", action="store_true", help="skip the traced run (it is several times slower)")
+    ap.add_argument("--json", help="write the report to this file")
+    args = ap.parse_args(argv)
+
+    if args.mode == "generate":
+        report = run_generate(args.algo or list(GENERATORS), args.sizes, args.seed, not args.no_check,
+                              not args.no_memory)
+        print_generate(report)
+    else:
+        report = run_solve(args.solver or list(SOLVERS), args.sizes, args.gen, args.seed)
+        print_solve(report)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0 if all(r["ok"] is not False for r in report["rows"]) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,411 @@
+# maze_grid.py
+# Headless maze engine for maze.py: same generate_maze / dfs_exploration_steps
+# API, but the grid is a packed bytearray (4 wall bits per cell, two cells per
+# byte) addressed by flat index i = y*cols + x, and nothing imports turtle.
+#
+#   python maze_grid.py 4000 4000 --seed 1      time generate + explore
+#   python maze_grid.py 1000 1000 --algo eller  any generator in GENERATORS
+#
+# A 4000x4000 maze is 8 MB of walls; the DFS stacks are array("I") and the
+# explorer can be consumed lazily with iter_exploration_steps(). In pure
+# Python that size is not quick: generate_maze takes about 24 s (~0.7 M
+# cells/s) and peaks around 53 MB, and exploring costs about 1 us per
+# step, some 6-12 s depending on how much of the maze the DFS walks.
+# Generators: backtracker (generate_maze), eller (row by row, O(cols) state),
+# kruskal (union-find), wilson (loop-erased random walks), binary-tree,
+# sidewinder. All open the same entrance/exit as maze.py.
+
+import argparse, random, sys, time
+from array import array
+
+# ==== Wall bits ====
+N, S, E, W = 1, 2, 4, 8
+ALL      = N | S | E | W
+BIT      = {"N": N, "S": S, "E": E, "W": W}
+OPP_BIT  = {N: S, S: N, E: W, W: E}
+
+class Maze:
+    """rows x cols grid of wall bits, packed two cells per byte (low nibble = even index)."""
+    __slots__ = ("rows", "cols", "cells")
+
+    def __init__(self, rows, cols):
+        self.rows, self.cols = rows, cols
+        self.cells = bytearray(b"\xff") * ((rows * cols + 1) // 2)
+
+    def index(self, x, y): return y * self.cols + x
+    def xy(self, i): return i % self.cols, i // self.cols
+
+    def walls(self, i):
+        return (self.cells[i >> 1] >> ((i & 1) << 2)) & ALL
+
+    def carve(self, i, bit):
+        """Remove wall `bit` of cell i and the matching wall of its neighbour."""
+        self.cells[i >> 1] &= ~(bit << ((i & 1) << 2))
+        j = self.neighbour(i, bit)
+        if j is not None:
+            self.cells[j >> 1] &= ~(OPP_BIT[bit] << ((j & 1) << 2))
+
+    def neighbour(self, i, bit):
+        """Index of the cell across wall `bit`, or None at the border."""
+        c = self.cols
+        if bit == N: return i - c if i >= c else None
+        if bit == S: return i + c if i + c < self.rows * c else None
+        if bit == E: return i + 1 if i % c < c - 1 else None
+        return i - 1 if i % c else None
+
+    def open_neighbours(self, i):
+        w = self.walls(i)
+        return [j for bit in (N, S, E, W) if not w & bit
+                for j in (self.neighbour(i, bit),) if j is not None]
+
+    def __getitem__(self, xy):
+        # maze.py's {"N": bool, ...} view of one cell, so draw_maze() takes a Maze
+        w = self.walls(self.index(*xy))
+        return {d: bool(w & b) for d, b in BIT.items()}
+
+    def set_row(self, y, row):
+        """Store one row of unpacked wall nibbles (one byte per cell)."""
+        a = self.cells
+        i = y * self.cols
+        for v in row:
+            k = i >> 1
+            a[k] = (a[k] & 0xF0 | v) if not i & 1 else (a[k] & 0x0F | v << 4)
+            i += 1
+
+    def nbytes(self): return len(self.cells)
+
+def is_perfect(m):
+    """Exactly rows*cols - 1 passages and every cell reachable: a spanning tree."""
+    c, n = m.cols, m.rows * m.cols
+    passages = 0
+    for i in range(n):
+        w = m.walls(i)
+        if i % c < c - 1 and not w & E:
+            passages += 1
+        if i + c < n and not w & S:
+            passages += 1
+    if passages != n - 1:
+        return False
+    seen = bytearray(n)
+    seen[0] = 1
+    stack, count = array("I", [0]), 1
+    while stack:
+        for j in m.open_neighbours(stack.pop()):
+            if not seen[j]:
+                seen[j] = 1
+                count += 1
+                stack.append(j)
+    return count == n
+
+# ==== Generation ====
+CHOICES = [tuple(d for d in range(4) if mask >> d & 1) for mask in range(16)]   # free-neighbour mask -> dirs
+DIR_BITS = (N, S, E, W)        # direction index 0..3 -> wall bit
+
+def _clear_masks(bits):
+    # [parity][dir] -> byte mask that clears that wall in the even/odd nibble
+    return [[~(b << shift) & 0xFF for b in bits] for shift in (0, 4)]
+
+CLEAR     = _clear_masks(DIR_BITS)
+CLEAR_OPP = _clear_masks([OPP_BIT[b] for b in DIR_BITS])
+
+# generate_maze: one byte per cell while carving, walls in the low nibble
+VISITED   = 16                 # also set on the border, so it is never entered
+STRIP     = bytes(v & ALL for v in range(256))            # bytes.translate: drop VISITED
+ENTERED   = [ALL & ~OPP_BIT[b] | VISITED for b in DIR_BITS]   # cell just entered through dir d
+LEAVE     = [~b & 0xFF for b in DIR_BITS]                 # clears the wall towards dir d
+# free-neighbour mask << 16 | 16 random bits -> a direction among the free ones
+# (three choices are off from a third by at most 1/65536)
+CHOOSE    = b"".join((bytes(ds) * (65536 // len(ds) + 1))[:65536] if ds else bytes(65536)
+                     for ds in CHOICES)
+RAND_CHUNK = 1 << 16           # 16-bit random values drawn per rng.randbytes call
+PACK_ROWS  = 256               # rows packed per step (even, so each step starts on a byte)
+
+def generate_maze(r, c, rng=random):
+    """Recursive backtracker, like maze.generate_maze, on a packed Maze.
+
+    Carving happens on one byte per cell with a one-cell border marked
+    VISITED, so there are no bounds checks and no separate visited map, and
+    a single stack of padded indices. Directions are looked up in CHOOSE with
+    random bits drawn in bulk. The grid is packed into the Maze at the end,
+    PACK_ROWS rows at a time.
+    """
+    c2 = c + 2
+    g = (bytearray([VISITED]) * (c2 + 1) + (bytearray([ALL]) * c + bytearray([VISITED, VISITED])) * r
+         + bytearray([VISITED]) * (c2 - 1))
+    step = (-c2, c2, 1, -1)
+    choose, leave, entered, v = CHOOSE, LEAVE, ENTERED, VISITED
+    p = c2 + 1
+    g[p] |= v
+    stack = array("I", [p])
+    push, pop = stack.append, stack.pop
+    bits, k = array("H"), 0
+    while True:
+        free = (g[p - c2] < v) | (g[p + c2] < v) << 1 | (g[p + 1] < v) << 2 | (g[p - 1] < v) << 3
+        if not free:
+            pop()
+            if not stack: break
+            p = stack[-1]
+            continue
+        if not k:
+            bits, k = array("H", rng.randbytes(2 * RAND_CHUNK)), RAND_CHUNK
+        k -= 1
+        d = choose[free << 16 | bits[k]]
+        g[p] &= leave[d]
+        p += step[d]
+        g[p] = entered[d]
+        push(p)
+
+    m = Maze(r, c)
+    a = m.cells
+    for y0 in range(0, r, PACK_ROWS):
+        flat = b"".join(g[(y + 1) * c2 + 1:(y + 1) * c2 + 1 + c]
+                        for y in range(y0, min(r, y0 + PACK_ROWS))).translate(STRIP)
+        if len(flat) & 1:
+            flat += bytes([ALL])
+        n = len(flat) // 2
+        lo, hi = int.from_bytes(flat[0::2], "little"), int.from_bytes(flat[1::2], "little")
+        start = y0 * c // 2
+        a[start:start + n] = (lo | hi << 4).to_bytes(n, "little")
+    return _open_ends(m)
+
+def _open_ends(m):
+    a = m.cells
+    a[0] &= ~W                                          # entrance (0,0) W
+    last = m.rows * m.cols - 1
+    a[last >> 1] &= ~(E << ((last & 1) << 2))           # exit (c-1,r-1) E
+    return m
+
+def eller_rows(r, c, rng=random):
+    """Eller's algorithm: yield each finished row as a bytearray of c wall
+    nibbles. Only the current row's set labels are kept, so memory is O(c)."""
+    rand, randrange = rng.random, rng.randrange
+    sets = list(range(c))          # set label per cell, always < c
+    down = bytearray(c)            # 1 where the row above opened S into this cell
+    for y in range(r):
+        last = y == r - 1
+        row = bytearray(b"\x0f") * c
+        for x in range(c):
+            if down[x]: row[x] = ALL & ~N
+        if y == 0: row[0] &= ~W
+        # join neighbours from different sets (all of them on the last row)
+        parent = list(range(c))
+        for x in range(c - 1):
+            ra, rb = sets[x], sets[x + 1]
+            while parent[ra] != ra: ra = parent[ra]
+            while parent[rb] != rb: rb = parent[rb]
+            if ra != rb and (last or rand() < 0.5):
+                parent[rb] = ra
+                row[x] &= ~E; row[x + 1] &= ~W
+        for x in range(c):
+            s = sets[x]
+            while parent[s] != s: s = parent[s]
+            sets[x] = s
+        if last:
+            row[c - 1] &= ~E
+            yield row
+            return
+        # every set goes down at least once
+        members = {}
+        for x in range(c):
+            members.setdefault(sets[x], []).append(x)
+        down = bytearray(c)
+        for xs in members.values():
+            went = False
+            for x in xs:
+                if rand() < 0.5:
+                    down[x] = 1; went = True
+            if not went:
+                down[xs[randrange(len(xs))]] = 1
+        # relabel to 0..c-1: kept sets first, then one fresh set per new cell
+        relabel = {}
+        for x in range(c):
+            if down[x]:
+                row[x] &= ~S
+                if sets[x] not in relabel:
+                    relabel[sets[x]] = len(relabel)
+        fresh = len(relabel)
+        for x in range(c):
+            if down[x]:
+                sets[x] = relabel[sets[x]]
+            else:
+                sets[x] = fresh; fresh += 1
+        yield row
+
+def generate_eller(r, c, rng=random):
+    m = Maze(r, c)
+    for y, row in enumerate(eller_rows(r, c, rng)):
+        m.set_row(y, row)
+    return m
+
+def generate_kruskal(r, c, rng=random):
+    """Randomized Kruskal: shuffle every inner wall, knock it down when it
+    separates two union-find sets."""
+    m = Maze(r, c)
+    a = m.cells
+    n = r * c
+    # wall id: i << 1 = east wall of i, i << 1 | 1 = south wall of i
+    walls = array("I")
+    walls.extend(i << 1 for i in range(n) if i % c < c - 1)
+    walls.extend(i << 1 | 1 for i in range(n - c))
+    rng.shuffle(walls)
+    parent = array("I", range(n))
+    joined = 0
+    for wall in walls:
+        i = wall >> 1
+        if wall & 1: j, d = i + c, 1
+        else: j, d = i + 1, 2
+        ri, rj = i, j
+        while parent[ri] != ri:
+            parent[ri] = parent[parent[ri]]; ri = parent[ri]
+        while parent[rj] != rj:
+            parent[rj] = parent[parent[rj]]; rj = parent[rj]
+        if ri == rj:
+            continue
+        parent[ri] = rj
+        a[i >> 1] &= CLEAR[i & 1][d]
+        a[j >> 1] &= CLEAR_OPP[j & 1][d]
+        joined += 1
+        if joined == n - 1:
+            break
+    return _open_ends(m)
+
+def generate_wilson(r, c, rng=random):
+    """Wilson's algorithm: loop-erased random walks from each cell not yet in
+    the tree. Unbiased, but slow until the tree has grown."""
+    m = Maze(r, c)
+    a = m.cells
+    n = r * c
+    rand = rng.random
+    istep = (-c, c, 1, -1)
+    in_tree = bytearray(n)
+    in_tree[rng.randrange(n)] = 1
+    heading = bytearray(n)          # last direction the walk left each cell by
+    for s in range(n):
+        if in_tree[s]:
+            continue
+        i = s
+        while not in_tree[i]:
+            x = i % c
+            ds = CHOICES[(i >= c) | (i + c < n) << 1 | (x < c - 1) << 2 | (x > 0) << 3]
+            d = ds[int(rand() * len(ds))]
+            heading[i] = d
+            i += istep[d]
+        # retrace the walk; overwritten headings have erased the loops
+        i = s
+        while not in_tree[i]:
+            d = heading[i]
+            j = i + istep[d]
+            a[i >> 1] &= CLEAR[i & 1][d]
+            a[j >> 1] &= CLEAR_OPP[j & 1][d]
+            in_tree[i] = 1
+            i = j
+    return _open_ends(m)
+
+def generate_binary_tree(r, c, rng=random):
+    """Carve north or west from every cell: fast, with a strong diagonal bias."""
+    m = Maze(r, c)
+    a = m.cells
+    rand = rng.random
+    for i in range(1, r * c):
+        x = i % c
+        d = 0 if not x or (i >= c and rand() < 0.5) else 3
+        j = i - c if d == 0 else i - 1
+        a[i >> 1] &= CLEAR[i & 1][d]
+        a[j >> 1] &= CLEAR_OPP[j & 1][d]
+    return _open_ends(m)
+
+def generate_sidewinder(r, c, rng=random):
+    """Row by row: extend a run east, or close it by carving north from a
+    random cell of the run. The top row is one corridor."""
+    m = Maze(r, c)
+    a = m.cells
+    rand = rng.random
+    for y in range(r):
+        start, end = y * c, y * c + c - 1
+        for i in range(start, end + 1):
+            if y and (i == end or rand() < 0.5):
+                k = start + int(rand() * (i - start + 1))
+                j = k - c
+                a[k >> 1] &= CLEAR[k & 1][0]
+                a[j >> 1] &= CLEAR_OPP[j & 1][0]
+                start = i + 1
+            elif i < end:
+                a[i >> 1] &= CLEAR[i & 1][2]
+                a[(i + 1) >> 1] &= CLEAR_OPP[(i + 1) & 1][2]
+    return _open_ends(m)
+
+GENERATORS = {
+    "backtracker": generate_maze,
+    "eller":       generate_eller,
+    "kruskal":     generate_kruskal,
+    "wilson":      generate_wilson,
+    "binary-tree": generate_binary_tree,
+    "sidewinder":  generate_sidewinder,
+}
+
+def generate(algo, r, c, rng=random):
+    return GENERATORS[algo](r, c, rng)
+
+# ==== Exploration ====
+def iter_exploration_steps(maze, start, goal, rng=random):
+    """Randomized DFS from start to goal, yielding maze.py actions
+    ('forward'|'backtrack', (x,y)) one at a time."""
+    a, c = maze.cells, maze.cols
+    n = maze.rows * c
+    rand = rng.random
+    seen = bytearray(n)
+    g = maze.index(*goal)
+    stack = array("I", [maze.index(*start)])
+    push, pop = stack.append, stack.pop
+    while stack:
+        i = stack[-1]
+        seen[i] = 1
+        if i == g:
+            break
+        w = (a[i >> 1] >> ((i & 1) << 2)) & 15
+        x = i % c
+        opts = []
+        if not w & N and i >= c and not seen[i - c]: opts.append(i - c)
+        if not w & S and i + c < n and not seen[i + c]: opts.append(i + c)
+        if not w & E and x < c - 1 and not seen[i + 1]: opts.append(i + 1)
+        if not w & W and x and not seen[i - 1]: opts.append(i - 1)
+        if opts:
+            j = opts[int(rand() * len(opts))] if len(opts) > 1 else opts[0]
+            push(j)
+            yield ("forward", (j % c, j // c))
+        else:
+            pop()
+            if not stack: break
+            j = stack[-1]
+            yield ("backtrack", (j % c, j // c))
+
+def dfs_exploration_steps(maze, start, goal, rng=random):
+    """Same as maze.dfs_exploration_steps: the whole action list."""
+    return list(iter_exploration_steps(maze, start, goal, rng))
+
+# ==== CLI ====
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Generate and explore a maze without turtle.")
+    ap.add_argument("rows", type=int)
+    ap.add_argument("cols", type=int)
+    ap.add_argument("--seed", type=int)
+    ap.add_argument("--algo", choices=list(GENERATORS), default="backtracker")
+    args = ap.parse_args(argv)
+    rng = random.Random(args.seed)
+
+    t0 = time.perf_counter()
+    m = generate(args.algo, args.rows, args.cols, rng)
+    t1 = time.perf_counter()
+    fwd = back = 0
+    for kind, _ in iter_exploration_steps(m, (0, 0), (args.cols - 1, args.rows - 1), rng):
+        if kind == "forward": fwd += 1
+        else: back += 1
+    t2 = time.perf_counter()
+    cells = args.rows * args.cols
+    print(f"{args.rows}x{args.cols}: {m.nbytes() / 1e6:.1f} MB of walls")
+    print(f"generate  {t1 - t0:.2f} s  ({cells / (t1 - t0) / 1e6:.2f} M cells/s)")
+    print(f"explore   {t2 - t1:.2f} s  ({fwd} forward, {back} backtrack)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+# maze_render.py
+# Fast maze drawing: merge walls into maximal horizontal / vertical runs and
+# draw each run once, with turtle, straight onto the Tk canvas, or into an
+# SVG / PNG file. Works on maze.py dict mazes, maze_grid.Maze, or a stream of
+# rows (maze_stream.MazeFile.iter_rows()).
+#
+#   python maze_render.py 300 300 --algo kruskal --svg maze.svg --png maze.png
+#   python maze_render.py --from tall.maze --svg tall.svg
+#
+# Coordinates are in cells, y growing downwards: a run is (x1, y1, x2, y2)
+# with either x1 == x2 (vertical) or y1 == y2 (horizontal).
+#
+# iter_wall_runs() produces the runs a line at a time with O(cols) state, and
+# save_svg / save_png write them out as they come, so --from renders a tall
+# streamed maze without ever holding all of its runs or pixels.
+
+import argparse, random, struct, sys, time, zlib
+
+from maze_grid import E, N, S, W, GENERATORS, generate
+
+CELL       = 22
+WALL_THICK = 2
+PNG_BAND   = 64     # save_png: vertical runs are cut every this many rows
+
+# ==== Runs ====
+def cell_rows(m, r, c):
+    """Wall bits of each row (lists of N|S|E|W ints), from a dict maze or a Maze."""
+    if isinstance(m, dict):
+        for y in range(r):
+            yield [(w["N"] and N) | (w["S"] and S) | (w["E"] and E) | (w["W"] and W)
+                   for w in (m[(x, y)] for x in range(c))]
+    else:
+        for y in range(r):
+            yield [m.walls(y * c + x) for x in range(c)]
+
+def _hline(runs, y, walls):
+    x0 = None
+    for x, wall in enumerate(walls):
+        if wall and x0 is None:
+            x0 = x
+        elif not wall and x0 is not None:
+            runs.append((x0, y, x, y)); x0 = None
+    if x0 is not None:
+        runs.append((x0, y, len(walls), y))
+
+def iter_wall_runs(rows, c, band=0):
+    """Every wall exactly once, merged into runs, one batch per wall line.
+
+    Reads the rows in order and keeps O(c) state, so it also works on
+    streamed mazes. Yields (runs, top): the runs ending on the line just
+    reached, and the highest line any later run can still touch. A vertical
+    run stays open until its wall stops, which for the outer walls is the
+    bottom; with `band` every open vertical run is cut every `band` rows, so
+    `top` keeps moving down.
+    """
+    vstart = [None] * (c + 1)        # row where the open run on each vertical line began
+    prev, y = None, 0
+    for y, row in enumerate(rows):
+        runs = []
+        cut = band and y % band == 0
+        _hline(runs, y, [row[x] & N or (prev is not None and prev[x] & S) for x in range(c)])
+        for x in range(c + 1):
+            wall = (x < c and row[x] & W) or (x > 0 and row[x - 1] & E)
+            if wall and vstart[x] is None:
+                vstart[x] = y
+            elif not wall and vstart[x] is not None:
+                runs.append((x, vstart[x], x, y)); vstart[x] = None
+            elif wall and cut and vstart[x] < y:
+                runs.append((x, vstart[x], x, y)); vstart[x] = y
+        prev = row
+        yield runs, min((y0 for y0 in vstart if y0 is not None), default=y + 1)
+    if prev is None:
+        return
+    bottom = y + 1
+    runs = []
+    _hline(runs, bottom, [prev[x] & S for x in range(c)])
+    for x, y0 in enumerate(vstart):
+        if y0 is not None:
+            runs.append((x, y0, x, bottom))
+    yield runs, bottom + 1
+
+def wall_runs_from_rows(rows, c):
+    """All runs of iter_wall_runs() as one list."""
+    return [run for runs, _ in iter_wall_runs(rows, c) for run in runs]
+
+def wall_runs(m, r, c):
+    return wall_runs_from_rows(cell_rows(m, r, c), c)
+
+def segment_count(m, r, c):
+    """How many segments the old per-cell draw_maze would have drawn."""
+    return sum(bin(v).count("1") for row in cell_rows(m, r, c) for v in row)
+
+# ==== Turtle / Tk ====
+def draw_runs_turtle(t, runs, cell=CELL):
+    """One penup/goto/pendown/goto per run, in maze.py's world coordinates."""
+    for x1, y1, x2, y2 in runs:
+        t.penup(); t.goto(x1 * cell, -y1 * cell)
+        t.pendown(); t.goto(x2 * cell, -y2 * cell)
+    t.penup()
+
+def draw_runs_canvas(canvas, runs, cell=CELL, xscale=1.0, yscale=1.0, color="white", width=WALL_THICK):
+    """create_line per run straight on a Tk canvas, bypassing turtle.
+    World (x, y) maps to canvas (x*xscale, -y*yscale), as turtle does."""
+    sx, sy = cell * xscale, cell * yscale
+    line = canvas.create_line
+    for x1, y1, x2, y2 in runs:
+        line(x1 * sx, y1 * sy, x2 * sx, y2 * sy, fill=color, width=width, capstyle="projecting")
+
+# ==== Files ====
+def save_svg(path, runs, r, c, cell=CELL, color="white", bg="black", width=WALL_THICK):
+    """One <path> of all `runs` (any iterable), written as they are read."""
+    pad = width
+    w, h = c * cell + 2 * pad, r * cell + 2 * pad
+    with open(path, "w") as f:
+        f.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{w}" height="{h}" '
+                f'viewBox="{-pad} {-pad} {w} {h}">\n'
+                f'<rect x="{-pad}" y="{-pad}" width="{w}" height="{h}" fill="{bg}"/>\n'
+                f'<path stroke="{color}" stroke-width="{width}" stroke-linecap="square" fill="none" d="')
+        sep = ""
+        for x1, y1, x2, y2 in runs:
+            f.write(f"{sep}M{x1 * cell} {y1 * cell}" + (f"H{x2 * cell}" if y1 == y2 else f"V{y2 * cell}"))
+            sep = " "
+        f.write('"/>\n</svg>\n')
+
+def _png_chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+def save_png(path, batches, r, c, cell=CELL, fg=255, bg=0, width=WALL_THICK):
+    """8-bit greyscale PNG, written with zlib only.
+
+    `batches` is iter_wall_runs() output; pixel rows are compressed and
+    written as soon as no later run can reach them, so with a band only
+    about band * cell pixel rows are held at a time.
+    """
+    pad = width
+    w, h = c * cell + 2 * pad + 1, r * cell + 2 * pad + 1
+    lo, hi = -(width // 2), (width + 1) // 2        # pixels either side of the wall line
+    blank = bytes([bg]) * w
+    img, top = [], 0                 # pixel rows top, top + 1, ... not written yet
+    z = zlib.compressobj(6)
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(_png_chunk(b"IHDR", struct.pack(">IIBBBBB", w, h, 8, 0, 0, 0, 0)))
+
+        def flush(upto):
+            nonlocal top
+            n = min(upto, h) - top
+            if n <= 0:
+                return
+            img.extend(bytearray(blank) for _ in range(n - len(img)))
+            data = z.compress(b"".join(b"\x00" + bytes(row) for row in img[:n]))
+            if data:
+                f.write(_png_chunk(b"IDAT", data))
+            del img[:n]
+            top += n
+
+        for runs, line in batches:
+            for x1, y1, x2, y2 in runs:
+                px1, py1, px2, py2 = x1 * cell + pad, y1 * cell + pad, x2 * cell + pad, y2 * cell + pad
+                img.extend(bytearray(blank) for _ in range(py2 + hi + 1 - top - len(img)))
+                if y1 == y2:
+                    for py in range(py1 + lo, py1 + hi + 1):
+                        img[py - top][px1 + lo:px2 + hi + 1] = bytes([fg]) * (px2 - px1 + hi - lo + 1)
+                else:
+                    strip = bytes([fg]) * (hi - lo + 1)
+                    for py in range(py1 + lo, py2 + hi + 1):
+                        img[py - top][px1 + lo:px1 + hi + 1] = strip
+            flush(line * cell + pad + lo)
+        flush(h)
+        f.write(_png_chunk(b"IDAT", z.flush()))
+        f.write(_png_chunk(b"IEND", b""))
+
+# ==== CLI ====
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Render a maze as merged wall runs to SVG / PNG.")
+    ap.add_argument("rows", type=int, nargs="?", default=100)
+    ap.add_argument("cols", type=int, nargs="?", default=100)
+    ap.add_argument("--algo", choices=list(GENERATORS), default="backtracker")
+    ap.add_argument("--seed", type=int)
+    ap.add_argument("--from", dest="source", help="read a maze_stream .maze file instead")
+    ap.add_argument("--cell", type=int, default=8, help="pixels per cell")
+    ap.add_argument("--svg")
+    ap.add_argument("--png")
+    args = ap.parse_args(argv)
+
+    if args.source:
+        from maze_stream import MazeFile
+        mf = MazeFile(args.source)
+        r, c = mf.rows, mf.cols
+        rows = mf.iter_rows          # every pass below streams the file again
+        segments = None
+    else:
+        mf = None
+        r, c = args.rows, args.cols
+        m = generate(args.algo, r, c, random.Random(args.seed))
+        rows = lambda: cell_rows(m, r, c)
+        segments = segment_count(m, r, c)
+    try:
+        t0 = time.perf_counter()
+        n = sum(len(runs) for runs, _ in iter_wall_runs(rows(), c))
+        print(f"{r}x{c}: {n} runs" + (f" instead of {segments} segments" if segments else "") +
+              f" in {time.perf_counter() - t0:.2f} s")
+        if args.svg:
+            t0 = time.perf_counter()
+            save_svg(args.svg, (run for runs, _ in iter_wall_runs(rows(), c) for run in runs), r, c, args.cell)
+            print(f"{args.svg} in {time.perf_counter() - t0:.2f} s")
+        if args.png:
+            t0 = time.perf_counter()
+            save_png(args.png, iter_wall_runs(rows(), c, PNG_BAND), r, c, args.cell)
+            print(f"{args.png} in {time.perf_counter() - t0:.2f} s")
+    finally:
+        if mf is not None:
+            mf.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+# maze_solve.py
+# Shortest-path solvers for maze_grid mazes, next to the randomized DFS explorer.
+#
+#   path, visited = solve_bfs(m, (0, 0), (m.cols - 1, m.rows - 1))
+#   path, actions = solve("astar", m, start, goal)      actions for maze.py playback
+#
+# Every solver works on flat cell indices with parent/queue arrays allocated
+# once up front, and returns the path as (x,y) cells plus the cells it visited
+# in order. exploration_actions() turns that visit order into maze.py's
+# ('forward'|'backtrack', (x,y)) steps by walking the maze between visits, so
+# the turtle playback can animate any of them.
+
+import heapq
+from array import array
+
+from maze_grid import ALL, E, N, S, W, Maze
+
+# ==== Helpers ====
+def _neighbours(a, c, n, i):
+    """Open, in-bounds neighbours of i (the entrance/exit gaps lead nowhere)."""
+    w = a[i >> 1] >> ((i & 1) << 2) & ALL
+    x = i % c
+    out = []
+    if not w & N and i >= c: out.append(i - c)
+    if not w & S and i + c < n: out.append(i + c)
+    if not w & E and x < c - 1: out.append(i + 1)
+    if not w & W and x: out.append(i - 1)
+    return out
+
+def _path(parent, s, g, c):
+    """Follow parent links from g back to s; [] if g was not reached."""
+    if parent[g] < 0:
+        return []
+    path = [g]
+    while path[-1] != s:
+        path.append(parent[path[-1]])
+    path.reverse()
+    return [(i % c, i // c) for i in path]
+
+def from_dict(m, rows, cols):
+    """Pack a maze.py dict maze ({(x,y): {"N": bool, ...}}) into a Maze."""
+    out = Maze(rows, cols)
+    out.cells[:] = bytes(len(out.cells))
+    for (x, y), walls in m.items():
+        i = y * cols + x
+        v = (walls["N"] and N) | (walls["S"] and S) | (walls["E"] and E) | (walls["W"] and W)
+        out.cells[i >> 1] |= v << ((i & 1) << 2)
+    return out
+
+# ==== Solvers ====
+def solve_dfs(m, start, goal):
+    """Plain DFS (fixed N, S, E, W order, unlike the shuffled explorer), for
+    comparison: its stack ends up as the path."""
+    a, c = m.cells, m.cols
+    n = m.rows * c
+    s, g = m.index(*start), m.index(*goal)
+    seen = bytearray(n)
+    stack, visited = array("I", [s]), array("I", [s])
+    seen[s] = 1
+    while stack and stack[-1] != g:
+        for j in _neighbours(a, c, n, stack[-1]):
+            if not seen[j]:
+                seen[j] = 1
+                stack.append(j)
+                visited.append(j)
+                break
+        else:
+            stack.pop()
+    return [(i % c, i // c) for i in stack], visited
+
+def solve_bfs(m, start, goal):
+    a, c = m.cells, m.cols
+    n = m.rows * c
+    s, g = m.index(*start), m.index(*goal)
+    parent = array("i", [-1]) * n
+    queue = array("I", [0]) * n               # also the visit order
+    parent[s] = s
+    queue[0], head, tail = s, 0, 1
+    while head < tail:
+        i = queue[head]
+        head += 1
+        if i == g:
+            break
+        for j in _neighbours(a, c, n, i):
+            if parent[j] < 0:
+                parent[j] = i
+                queue[tail] = j
+                tail += 1
+    return _path(parent, s, g, c), queue[:head]
+
+def solve_astar(m, start, goal):
+    """A* with the Manhattan distance; ties go to the cell nearer the goal."""
+    a, c = m.cells, m.cols
+    n = m.rows * c
+    s, g = m.index(*start), m.index(*goal)
+    gx, gy = goal
+    parent = array("i", [-1]) * n
+    dist = array("i", [-1]) * n
+    closed = bytearray(n)
+    visited = array("I")
+    parent[s], dist[s] = s, 0
+    heap = [(abs(start[0] - gx) + abs(start[1] - gy), 0, s)]
+    while heap:
+        _, h, i = heapq.heappop(heap)
+        if closed[i]:
+            continue
+        closed[i] = 1
+        visited.append(i)
+        if i == g:
+            break
+        d = dist[i] + 1
+        for j in _neighbours(a, c, n, i):
+            if not closed[j] and (dist[j] < 0 or d < dist[j]):
+                dist[j], parent[j] = d, i
+                hj = abs(j % c - gx) + abs(j // c - gy)
+                heapq.heappush(heap, (d + hj, hj, j))
+    return _path(parent, s, g, c), visited
+
+def solve_bidirectional(m, start, goal):
+    """BFS from both ends, a whole level of the smaller frontier at a time,
+    until the two searches touch. Like solve_bfs, `visited` lists cells as
+    they are expanded."""
+    a, c = m.cells, m.cols
+    n = m.rows * c
+    s, g = m.index(*start), m.index(*goal)
+    parent = array("i", [-1]) * n
+    side = bytearray(n)                      # 1 = reached from start, 2 = from goal
+    queues = (array("I", [0]) * n, array("I", [0]) * n)
+    bounds = [[0, 1], [0, 1]]                # head, tail per side
+    queues[0][0], queues[1][0] = s, g
+    parent[s], parent[g] = s, g
+    side[s], side[g] = 1, 2
+    visited = array("I", [s] if s == g else [])
+    meet = s if s == g else None
+    while meet is None and bounds[0][0] < bounds[0][1] and bounds[1][0] < bounds[1][1]:
+        k = 0 if bounds[0][1] - bounds[0][0] <= bounds[1][1] - bounds[1][0] else 1
+        q, b, mine = queues[k], bounds[k], k + 1
+        level_end = b[1]
+        while b[0] < level_end and meet is None:
+            i = q[b[0]]
+            b[0] += 1
+            visited.append(i)
+            for j in _neighbours(a, c, n, i):
+                if side[j] == mine:
+                    continue
+                if side[j]:
+                    meet = (i, j) if k == 0 else (j, i)   # (start side, goal side)
+                    break
+                side[j], parent[j] = mine, i
+                q[b[1]] = j
+                b[1] += 1
+    if s == g:
+        return [start], visited
+    if meet is None:
+        return [], visited
+    i, j = meet
+    half = [i]
+    while half[-1] != s:
+        half.append(parent[half[-1]])
+    half.reverse()
+    half.append(j)
+    while half[-1] != g:
+        half.append(parent[half[-1]])
+    return [(v % c, v // c) for v in half], visited
+
+def solve_dead_end(m, start, goal):
+    """Dead-end filling: keep walling off cells with one way out (other than
+    start and goal) until only the solution corridor is left. Visits every
+    cell; `visited` is the fill order."""
+    a, c = m.cells, m.cols
+    n = m.rows * c
+    s, g = m.index(*start), m.index(*goal)
+    degree = bytearray(n)
+    filled = bytearray(n)
+    queue = array("I", [0]) * n
+    tail = 0
+    for i in range(n):
+        degree[i] = len(_neighbours(a, c, n, i))
+        if degree[i] <= 1 and i != s and i != g:
+            queue[tail] = i
+            tail += 1
+    head = 0
+    while head < tail:
+        i = queue[head]
+        head += 1
+        filled[i] = 1
+        for j in _neighbours(a, c, n, i):
+            if not filled[j]:
+                degree[j] -= 1
+                if degree[j] == 1 and j != s and j != g:
+                    queue[tail] = j
+                    tail += 1
+    # walk the corridor that is left
+    path, prev, i = [s], -1, s
+    while i != g:
+        nxt = [j for j in _neighbours(a, c, n, i) if not filled[j] and j != prev]
+        if not nxt:
+            return [], queue[:tail]
+        prev, i = i, nxt[0]
+        path.append(i)
+    return [(v % c, v // c) for v in path], queue[:tail]
+
+SOLVERS = {
+    "dfs":           solve_dfs,
+    "bfs":           solve_bfs,
+    "astar":         solve_astar,
+    "bidirectional": solve_bidirectional,
+    "dead-end":      solve_dead_end,
+}
+
+# ==== Playback ====
+def exploration_actions(m, visited, start, goal=None):
+    """maze.py actions that walk from start to each visited cell in turn (and
+    on to goal). Steps towards start are 'backtrack', away from it 'forward'.
+    For animation only: the walk between far-apart visits can be long."""
+    a, c = m.cells, m.cols
+    n = m.rows * c
+    s = m.index(*start)
+    # the maze as a tree rooted at start
+    parent = array("i", [-1]) * n
+    depth = array("I", [0]) * n
+    queue = array("I", [0]) * n
+    parent[s] = s
+    queue[0], head, tail = s, 0, 1
+    while head < tail:
+        i = queue[head]
+        head += 1
+        for j in _neighbours(a, c, n, i):
+            if parent[j] < 0:
+                parent[j], depth[j] = i, depth[i] + 1
+                queue[tail] = j
+                tail += 1
+
+    actions = []
+    cur = s
+    targets = list(visited)
+    if goal is not None:
+        targets.append(m.index(*goal))
+    for t in targets:
+        if t == cur or parent[t] < 0:
+            continue
+        up, down, u, v = [], [], cur, t
+        while depth[u] > depth[v]:
+            u = parent[u]; up.append(u)
+        while depth[v] > depth[u]:
+            down.append(v); v = parent[v]
+        while u != v:
+            u = parent[u]; up.append(u)
+            down.append(v); v = parent[v]
+        actions.extend(("backtrack", (i % c, i // c)) for i in up)
+        actions.extend(("forward", (i % c, i // c)) for i in reversed(down))
+        cur = t
+    return actions
+
+def solve(name, m, start, goal, actions=True):
+    """Run SOLVERS[name]; returns (path, playback actions) or (path, visited)."""
+    path, visited = SOLVERS[name](m, start, goal)
+    if actions:
+        return path, exploration_actions(m, visited, start, goal)
+    return path, visited
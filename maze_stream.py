@@ -0,0 +1,299 @@
+# maze_stream.py
+# Mazes too tall to hold in memory: generate, store, solve and render them a
+# few rows at a time, with memory bounded by the width, not the height.
+#
+#   python maze_stream.py 1000000 16 --out tall.maze --render tall --chunk 20000
+#
+# 1. maze_grid.eller_rows() yields finished rows; write_maze() packs them into
+#    a .maze file (header + one row after another, two cells per byte).
+# 2. MazeFile reads rows back through a small cache of row chunks.
+# 3. iter_wall_follower_steps() walks it with the left-hand rule. In a perfect
+#    maze that is a DFS, so it yields maze.py's ('forward'|'backtrack', (x,y))
+#    actions; its stack (= the path so far) is a DiskStack that spills to a
+#    temp file. solve() leaves the solution as a row-aligned bit mask file.
+# 4. render_pgm() draws rows [y0, y1) to a greyscale PGM, one maze row at a time.
+
+import argparse, mmap, os, random, resource, struct, sys, tempfile, time
+from array import array
+from collections import OrderedDict
+
+from maze_grid import ALL, E, N, S, W, eller_rows
+
+MAGIC        = b"MAZ1"
+HEADER       = struct.Struct("<4sII")      # magic, rows, cols
+CHUNK_ROWS   = 1024                        # rows per cached chunk
+CACHE_CHUNKS = 8
+STACK_CHUNK  = 1 << 16                     # DiskStack entries kept per spill
+
+# ==== File format ====
+def pack_row(row):
+    """Wall nibbles (one byte per cell) -> two cells per byte, low nibble first."""
+    if len(row) & 1:
+        row = row + b"\x00"
+    return bytes(a | b << 4 for a, b in zip(row[0::2], row[1::2]))
+
+def write_maze(path, rows, cols, row_iter):
+    """Write rows as they arrive; returns the number written."""
+    n = 0
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, rows, cols))
+        for row in row_iter:
+            f.write(pack_row(row))
+            n += 1
+    return n
+
+class MazeFile:
+    """Random access to the rows of a .maze file through an LRU chunk cache."""
+    def __init__(self, path, chunk_rows=CHUNK_ROWS, cache_chunks=CACHE_CHUNKS):
+        self.f = open(path, "rb")
+        magic, self.rows, self.cols = HEADER.unpack(self.f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a maze file")
+        self.stride = (self.cols + 1) // 2
+        self.chunk_rows, self.cache_chunks = chunk_rows, cache_chunks
+        self.cache = OrderedDict()
+
+    def close(self): self.f.close()
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+
+    def row(self, y):
+        """Packed bytes of row y (a memoryview into the cached chunk)."""
+        k, off = divmod(y, self.chunk_rows)
+        chunk = self.cache.get(k)
+        if chunk is None:
+            self.f.seek(HEADER.size + k * self.chunk_rows * self.stride)
+            chunk = memoryview(self.f.read(self.chunk_rows * self.stride))
+            self.cache[k] = chunk
+            if len(self.cache) > self.cache_chunks:
+                self.cache.popitem(last=False)
+        else:
+            self.cache.move_to_end(k)
+        return chunk[off * self.stride:(off + 1) * self.stride]
+
+    def iter_rows(self):
+        """Unpacked wall nibbles of each row, top to bottom."""
+        c = self.cols
+        for y in range(self.rows):
+            packed = self.row(y)
+            row = bytearray(2 * len(packed))
+            row[0::2] = bytes(b & 15 for b in packed)
+            row[1::2] = bytes(b >> 4 for b in packed)
+            yield row[:c]
+
+# ==== Disk-backed stack ====
+class DiskStack:
+    """Stack of cell indices that keeps at most 2*chunk entries in memory and
+    spills older ones to a temp file."""
+    def __init__(self, chunk=STACK_CHUNK):
+        self.chunk = chunk
+        self.f = tempfile.TemporaryFile()
+        self.tail = array("I")
+        self.spilled = 0                   # entries on disk, below the tail
+
+    def __len__(self): return self.spilled + len(self.tail)
+
+    def push(self, v):
+        tail = self.tail
+        tail.append(v)
+        if len(tail) >= 2 * self.chunk:
+            self.f.seek(self.spilled * tail.itemsize)
+            tail[:self.chunk].tofile(self.f)
+            self.spilled += self.chunk
+            del tail[:self.chunk]
+
+    def _reload(self):
+        self.spilled -= self.chunk
+        self.f.seek(self.spilled * self.tail.itemsize)
+        back = array("I")
+        back.fromfile(self.f, self.chunk)
+        self.tail = back + self.tail
+
+    def pop(self):
+        if not self.tail:
+            self._reload()
+        return self.tail.pop()
+
+    def peek(self, k=1):
+        """k-th entry from the top (1 = top), or None if the stack is shorter."""
+        if len(self.tail) < k and self.spilled:
+            self._reload()
+        return self.tail[-k] if len(self.tail) >= k else None
+
+    def __iter__(self):
+        """Bottom to top."""
+        self.f.seek(0)
+        for _ in range(0, self.spilled, self.chunk):
+            part = array("I")
+            part.fromfile(self.f, self.chunk)
+            yield from part
+        yield from self.tail
+
+    def close(self): self.f.close()
+
+# ==== Explorer ====
+# clockwise N, E, S, W: wall bit and step
+CW_BIT = (N, E, S, W)
+CW_DX  = (0, 1, 0, -1)
+CW_DY  = (-1, 0, 1, 0)
+
+def iter_wall_follower_steps(mf, start, goal, stack=None):
+    """Left-hand-rule walk from start to goal over a MazeFile, as maze.py
+    actions. In a perfect maze this is a DFS: stepping back onto the cell
+    under the top of `stack` is a backtrack, anything else is forward. When
+    the goal is reached `stack` holds the solution path (as y*cols + x)."""
+    c, r = mf.cols, mf.rows
+    stack = stack if stack is not None else DiskStack()
+    x, y = start
+    gx, gy = goal
+    h = 1                                  # heading east, into the maze
+    row, ry = mf.row(y), y
+    stack.push(y * c + x)
+    while (x, y) != (gx, gy):
+        if y != ry:
+            row, ry = mf.row(y), y
+        w = row[x >> 1] >> ((x & 1) << 2) & ALL
+        for turn in (3, 0, 1, 2):          # left, ahead, right, back
+            d = (h + turn) & 3
+            nx, ny = x + CW_DX[d], y + CW_DY[d]
+            if not w & CW_BIT[d] and 0 <= nx < c and 0 <= ny < r:
+                break
+        else:
+            return                         # walled-in start
+        h, x, y = d, nx, ny
+        i = y * c + x
+        if stack.peek(2) == i:
+            stack.pop()
+            yield ("backtrack", (x, y))
+        else:
+            stack.push(i)
+            yield ("forward", (x, y))
+
+def solve(mf, mask_path, start=(0, 0), goal=None):
+    """Walk to the goal and write the path as a bit mask, one (cols+7)//8-byte
+    row per maze row. Returns (path length, steps walked)."""
+    c, r = mf.cols, mf.rows
+    goal = goal or (c - 1, r - 1)
+    stack = DiskStack()
+    steps = 0
+    for _ in iter_wall_follower_steps(mf, start, goal, stack):
+        steps += 1
+    stride = (c + 7) // 8
+    with open(mask_path, "wb") as f:
+        f.truncate(r * stride)
+    with open(mask_path, "r+b") as f, mmap.mmap(f.fileno(), 0) as mask:
+        for i in stack:
+            y, x = divmod(i, c)
+            mask[y * stride + (x >> 3)] |= 1 << (x & 7)
+    length = len(stack)
+    stack.close()
+    return length, steps
+
+# ==== Renderer ====
+BG, WALL, PATH = 0, 255, 110
+
+def render_pgm(mf, out_path, y0=0, y1=None, cell=4, mask_path=None):
+    """Rows [y0, y1) as a binary PGM: walls white, solution (if given) grey.
+    Only one maze row of pixels is built at a time."""
+    c = mf.cols
+    y1 = mf.rows if y1 is None else min(y1, mf.rows)
+    width, height = c * cell + 1, (y1 - y0) * cell + 1
+    stride = (c + 7) // 8
+    mask = open(mask_path, "rb") if mask_path else None
+    above = None                             # path bits of the previous row
+    if mask and y0:
+        mask.seek((y0 - 1) * stride)
+        above = mask.read(stride)
+    with open(out_path, "wb") as out:
+        out.write(b"P5 %d %d 255\n" % (width, height))
+        for y in range(y0, y1):
+            packed = mf.row(y)
+            bits = None
+            if mask:
+                mask.seek(y * stride)
+                bits = mask.read(stride)
+            top = bytearray(width)           # the row's N walls
+            body = bytearray(width)          # W/E walls (and path fill)
+            for x in range(c):
+                w = packed[x >> 1] >> ((x & 1) << 2) & ALL
+                px = x * cell
+                if bits and bits[x >> 3] >> (x & 7) & 1:
+                    body[px + 1:px + cell] = bytes([PATH]) * (cell - 1)
+                    # join to path neighbours through open walls
+                    if x and not w & W and bits[(x - 1) >> 3] >> ((x - 1) & 7) & 1:
+                        body[px] = PATH
+                    if above and not w & N and above[x >> 3] >> (x & 7) & 1:
+                        top[px + 1:px + cell] = bytes([PATH]) * (cell - 1)
+                if w & N:
+                    top[px:px + cell + 1] = bytes([WALL]) * (cell + 1)
+                else:
+                    top[px] = top[px + cell] = WALL     # corners
+                if w & W:
+                    body[px] = WALL
+                if w & E:
+                    body[px + cell] = WALL
+            out.write(top)
+            for _ in range(cell - 1):
+                out.write(body)
+            above = bits
+            if y == y1 - 1:                  # close the bottom with the S walls
+                bottom = bytearray(width)
+                for x in range(c):
+                    w = packed[x >> 1] >> ((x & 1) << 2) & ALL
+                    px = x * cell
+                    if w & S:
+                        bottom[px:px + cell + 1] = bytes([WALL]) * (cell + 1)
+                    else:
+                        bottom[px] = bottom[px + cell] = WALL
+                out.write(bottom)
+    if mask:
+        mask.close()
+
+def render_chunks(mf, prefix, chunk, cell=4, mask_path=None):
+    """One PGM per `chunk` rows: prefix_00000.pgm, prefix_00001.pgm, ..."""
+    names = []
+    for k, y0 in enumerate(range(0, mf.rows, chunk)):
+        name = f"{prefix}_{k:05d}.pgm"
+        render_pgm(mf, name, y0, y0 + chunk, cell, mask_path)
+        names.append(name)
+    return names
+
+# ==== CLI ====
+def peak_mb():
+    # ru_maxrss is in bytes on macOS, KB on Linux
+    scale = 2**20 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Generate, solve and render a maze a few rows at a time.")
+    ap.add_argument("rows", type=int)
+    ap.add_argument("cols", type=int)
+    ap.add_argument("--out", default="maze.maze", help="maze file to write")
+    ap.add_argument("--seed", type=int)
+    ap.add_argument("--no-solve", action="store_true")
+    ap.add_argument("--render", metavar="PREFIX", help="write PREFIX_NNNNN.pgm images")
+    ap.add_argument("--chunk", type=int, default=10000, help="maze rows per image")
+    ap.add_argument("--cell", type=int, default=4, help="pixels per cell")
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    write_maze(args.out, args.rows, args.cols, eller_rows(args.rows, args.cols, random.Random(args.seed)))
+    print(f"generated {args.rows}x{args.cols} -> {args.out} ({os.path.getsize(args.out) / 1e6:.1f} MB) "
+          f"in {time.perf_counter() - t0:.1f} s, peak {peak_mb():.0f} MB")
+
+    mask_path = None
+    with MazeFile(args.out) as mf:
+        if not args.no_solve:
+            t0 = time.perf_counter()
+            mask_path = args.out + ".path"
+            length, steps = solve(mf, mask_path)
+            print(f"solved: path {length} cells, {steps} steps walked, in {time.perf_counter() - t0:.1f} s, "
+                  f"peak {peak_mb():.0f} MB")
+        if args.render:
+            t0 = time.perf_counter()
+            names = render_chunks(mf, args.render, args.chunk, args.cell, mask_path)
+            print(f"rendered {len(names)} images in {time.perf_counter() - t0:.1f} s, peak {peak_mb():.0f} MB")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,29 @@
+import chess
+
+import chess_eval
+from chess_eval import KING_ATTACK, SHIELD, RichEvaluator, evaluate_many, king_safety
+
+def test_king_safety_counts_queen_on_rank():
+    """A queen hitting the king zone along a rank weighs as a queen, not nothing."""
+    board = chess.Board("7k/8/8/8/8/8/5PPP/3q2K1 w - - 0 1")
+    assert king_safety(board) == 3 * SHIELD - KING_ATTACK[chess.QUEEN]
+
+def test_king_safety_counts_queen_once():
+    """A queen hitting the king zone along both a rank and a diagonal is one attacker."""
+    board = chess.Board("7k/8/8/8/8/8/6PP/4q1K1 w - - 0 1")
+    assert king_safety(board) == 2 * SHIELD - KING_ATTACK[chess.QUEEN]
+
+FENS = [chess.STARTING_FEN,
+        "r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - 4 4",
+        "7k/8/8/8/8/8/5PPP/3q2K1 b - - 0 1",
+        "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1"]
+
+def test_evaluate_many_matches_rich_evaluator():
+    boards = [chess.Board(f) for f in FENS]
+    assert evaluate_many(boards) == [RichEvaluator(b).evaluate() for b in boards]
+    assert evaluate_many([]) == []
+
+def test_evaluate_many_without_numpy(monkeypatch):
+    monkeypatch.setattr(chess_eval, "np", None)
+    boards = [chess.Board(f) for f in FENS]
+    assert evaluate_many(boards) == [RichEvaluator(b).evaluate() for b in boards]
@@ -0,0 +1,28 @@
+import chess_match
+from chess_engine import Evaluator
+
+def test_play_game_keeps_evaluator_in_sync(monkeypatch):
+    """play_game pushes moves straight on its board; each search must still
+    start from that position's real score, not the one it first saw."""
+    checked = []
+    make_search = chess_match.make_search
+
+    def recording_search(cfg):
+        search = make_search(cfg)
+        best_move = search.best_move
+
+        def checked_best_move(board, depth, movetime):
+            move = best_move(board, depth, movetime)
+            checked.append((search.ev.score, Evaluator(board).score))
+            return move
+        search.best_move = checked_best_move
+        return search
+
+    monkeypatch.setattr(chess_match, "make_search", recording_search)
+    monkeypatch.setattr(chess_match, "MAX_PLIES", 10)
+    engine = chess_match.parse_engine("depth=1")
+    # starts a pawn up for White so the score is not 0 from move one
+    fen = "rnbqkbnr/ppp1pppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+    chess_match.play_game(0, fen, engine, engine)
+    assert len(checked) == 10
+    assert all(ev == fresh for ev, fresh in checked)